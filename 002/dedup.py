@@ -0,0 +1,280 @@
+"""查找重复文件
+
+分四步逐步缩小范围，只有可能重复的文件才会被完整读取：
+1. 遍历目录，把每个文件的大小计入一个固定大小的计数表（按大小散列，每格计到 2 为止）；
+2. 再遍历一次，只记下计数表中出现过两次以上的大小的文件，按大小分组；
+3. 同样大小的文件比较开头和结尾各 64 KB 的散列（线程池，只读 128 KB）；
+4. 仍然相同的文件在进程池中用 mmap 读取，计算完整的 BLAKE2 散列。
+
+计数表的大小固定，内存只与候选文件的数量有关，与总文件数无关，上千万个文件也可以处理。
+硬链接（同一 inode）只算一份，不跟随符号链接，不进入其他文件系统。
+
+    python dedup.py D:\\ --json duplicates.json
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import sys
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# 部分散列读取开头和结尾各这么多字节；不超过两倍大小的文件部分散列就是整个文件的散列
+PARTIAL_BYTES = 64 * 1024
+
+# 计数表的格数（2 的幂），每格 1 字节
+FILTER_SLOTS = 1 << 24
+
+# 进度回调的最短间隔（秒）
+PROGRESS_INTERVAL = 0.1
+
+# 各步骤在进度回调中的名称
+STAGES = ("统计文件大小", "收集候选文件", "比较文件首尾", "计算完整散列")
+
+_GOLDEN = 0x9E3779B97F4A7C15
+_MASK64 = (1 << 64) - 1
+
+class DuplicateGroup(namedtuple("DuplicateGroup", "size digest paths")):
+    """内容相同的一组文件"""
+    __slots__ = ()
+
+    @property
+    def reclaimable(self):
+        """只保留一份时可以释放的字节数"""
+        return self.size * (len(self.paths) - 1)
+
+class DedupCancelled(Exception):
+    pass
+
+def iter_files(root, device=None):
+    """遍历 root 下的普通文件，产出 (路径, 大小, inode)
+
+    不跟随符号链接；device 不为空时跳过其他文件系统上的目录。无法读取的目录和文件直接跳过。
+    """
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdir_device = entry.stat(follow_symlinks=False).st_dev
+                            # Windows 上 scandir 不提供设备号（为0），此时不做判断
+                            if not device or not subdir_device or subdir_device == device:
+                                stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            yield entry.path, entry.stat(follow_symlinks=False).st_size, entry.inode()
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+
+def _slot(size, bits):
+    """大小在计数表中的格子（乘法散列取高位）"""
+    return (size * _GOLDEN & _MASK64) >> (64 - bits)
+
+def _partial_hash(path, size):
+    """开头和结尾各 PARTIAL_BYTES 的散列；文件已被修改或无法读取时返回 None"""
+    try:
+        with open(path, "rb") as f:
+            digest = hashlib.blake2b(digest_size=32)
+            head = f.read(PARTIAL_BYTES if size > 2 * PARTIAL_BYTES else size)
+            digest.update(head)
+            if size > 2 * PARTIAL_BYTES:
+                f.seek(-PARTIAL_BYTES, os.SEEK_END)
+                digest.update(f.read(PARTIAL_BYTES))
+            elif len(head) != size or f.read(1):
+                return None
+            if os.fstat(f.fileno()).st_size != size:
+                return None
+            return digest.digest()
+    except OSError:
+        return None
+
+def _full_hash(path, size):
+    """整个文件的 BLAKE2 散列（在进程池中运行）；文件已被修改或无法读取时返回 None"""
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size != size:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return hashlib.blake2b(mapped, digest_size=32).hexdigest()
+    except (OSError, ValueError):
+        return None
+
+def _map_ordered(func, tasks, workers=None, executor=ProcessPoolExecutor):
+    """按任务顺序依次产出 func(*task) 的结果
+
+    workers 大于1时在进程池（或 executor 指定的线程池）中并行计算，
+    同时最多保留 2*workers 个未取回的任务，候选文件再多也不会一次性全部提交。
+    """
+    if not workers or workers <= 1:
+        for task in tasks:
+            yield func(*task)
+        return
+    with executor(max_workers=workers) as pool:
+        futures = deque()
+        for task in tasks:
+            futures.append(pool.submit(func, *task))
+            if len(futures) >= workers * 2:
+                yield futures.popleft().result()
+        while futures:
+            yield futures.popleft().result()
+
+def _group_by(items, key):
+    groups = {}
+    for item in items:
+        groups.setdefault(key(item), []).append(item)
+    return [group for group in groups.values() if len(group) > 1]
+
+class DuplicateFinder:
+    """在 root 下查找内容相同的文件
+
+    progress(步骤, 已完成, 总数, 可释放字节数) 在运行查找的线程中调用，间隔不小于 PROGRESS_INTERVAL；
+    步骤为 STAGES 中的名称，总数未知时为 0。
+    """
+    def __init__(self, root, workers=None, min_size=1, progress=None, filter_slots=FILTER_SLOTS):
+        self.root = root
+        self.workers = workers or os.cpu_count() or 1
+        self.min_size = max(min_size, 1)
+        self.progress = progress
+        self.filter_bits = max(filter_slots.bit_length() - 1, 1)
+        self.reclaimable = 0
+        self._cancelled = threading.Event()
+        self._last_report = 0.0
+        try:
+            self._device = os.stat(root).st_dev
+        except OSError:
+            self._device = None
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def _report(self, stage, done, total, force=False):
+        if self._cancelled.is_set():
+            raise DedupCancelled()
+        now = time.perf_counter()
+        if self.progress is None or not force and now - self._last_report < PROGRESS_INTERVAL:
+            return
+        self._last_report = now
+        self.progress(stage, done, total, self.reclaimable)
+
+    def run(self):
+        """返回重复文件组的列表，按可释放字节数从大到小排列；取消时抛出 DedupCancelled"""
+        counts, total = self._count_sizes()
+        candidates = self._collect_candidates(counts, total)
+        del counts
+        groups = self._compare_partial(candidates)
+        duplicates = self._compare_full(groups)
+        duplicates.sort(key=lambda group: group.reclaimable, reverse=True)
+        self._report(STAGES[-1], 1, 1, force=True)
+        return duplicates
+
+    def _count_sizes(self):
+        """第一遍：按大小计数，每格最多计到 2"""
+        counts = bytearray(1 << self.filter_bits)
+        files = 0
+        for _, size, _ in iter_files(self.root, self._device):
+            if size >= self.min_size:
+                slot = _slot(size, self.filter_bits)
+                if counts[slot] < 2:
+                    counts[slot] += 1
+            files += 1
+            if files % 1024 == 0:
+                self._report(STAGES[0], files, 0)
+        return counts, files
+
+    def _collect_candidates(self, counts, total):
+        """第二遍：只保留计数表中出现两次以上的大小，按实际大小分组，同一 inode 只留一个"""
+        by_size = {}
+        files = 0
+        for path, size, inode in iter_files(self.root, self._device):
+            if size >= self.min_size and counts[_slot(size, self.filter_bits)] > 1:
+                by_size.setdefault(size, {}).setdefault(inode or path, path)
+            files += 1
+            if files % 1024 == 0:
+                self._report(STAGES[1], files, total)
+        # 计数表有误判，实际只有一个文件的大小在这里去掉
+        return [(size, list(paths.values())) for size, paths in by_size.items() if len(paths) > 1]
+
+    def _compare_partial(self, candidates):
+        """比较首尾的散列，返回 (大小, 部分散列, 路径列表) 的列表，大的文件在前"""
+        candidates.sort(key=lambda item: item[0], reverse=True)
+        tasks = [(path, size) for size, paths in candidates for path in paths]
+        del candidates
+        digests = []
+        # 每个文件只读 128 KB，读文件和计算散列时都会释放 GIL，用线程即可
+        results = _map_ordered(_partial_hash, tasks, self.workers * 4, ThreadPoolExecutor)
+        for done, digest in enumerate(results, 1):
+            digests.append(digest)
+            if done % 256 == 0:
+                self._report(STAGES[2], done, len(tasks))
+        hashed = [(size, digest, path) for (path, size), digest in zip(tasks, digests) if digest is not None]
+        return [(group[0][0], group[0][1], [path for _, _, path in group])
+                for group in _group_by(hashed, lambda item: item[:2])]
+
+    def _compare_full(self, groups):
+        """不超过 2*PARTIAL_BYTES 的文件部分散列已覆盖全部内容；其余文件计算完整散列"""
+        duplicates = []
+        large = []
+        for size, digest, paths in groups:
+            if size <= 2 * PARTIAL_BYTES:
+                self._add(duplicates, DuplicateGroup(size, digest.hex(), paths))
+            else:
+                large.append((size, paths))
+        total = sum(size * len(paths) for size, paths in large)
+        done = 0
+        tasks = ((path, size) for size, paths in large for path in paths)
+        results = _map_ordered(_full_hash, tasks, self.workers)
+        for size, paths in large:
+            hashed = []
+            for path in paths:
+                hashed.append((next(results), path))
+                done += size
+                self._report(STAGES[3], done, total)
+            for group in _group_by([item for item in hashed if item[0] is not None], lambda item: item[0]):
+                self._add(duplicates, DuplicateGroup(size, group[0][0], [path for _, path in group]))
+        return duplicates
+
+    def _add(self, duplicates, group):
+        duplicates.append(group)
+        self.reclaimable += group.reclaimable
+
+def main(argv=None):
+    from disk_scanner import format_size
+
+    parser = argparse.ArgumentParser(description="查找目录下内容相同的文件")
+    parser.add_argument("root", help="查找的目录")
+    parser.add_argument("--workers", type=int, help="计算完整散列的进程数")
+    parser.add_argument("--min-size", type=int, default=1, help="忽略小于这个字节数的文件")
+    parser.add_argument("--json", help="把结果写入这个 JSON 文件")
+    args = parser.parse_args(argv)
+
+    def progress(stage, done, total, reclaimable):
+        count = f"{done}/{total}" if total else f"{done}"
+        print(f"\r{stage} {count}，可释放 {format_size(reclaimable)}".ljust(60), end="", file=sys.stderr, flush=True)
+
+    finder = DuplicateFinder(args.root, args.workers, args.min_size, progress)
+    start = time.perf_counter()
+    try:
+        duplicates = finder.run()
+    except KeyboardInterrupt:
+        print("\n已取消", file=sys.stderr)
+        return 1
+    print(file=sys.stderr)
+    for group in duplicates:
+        print(f"{format_size(group.size)} × {len(group.paths)}  {group.digest[:16]}")
+        for path in group.paths:
+            print(f"    {path}")
+    print(f"{len(duplicates)} 组重复文件，可释放 {format_size(finder.reclaimable)}，"
+          f"用时 {time.perf_counter() - start:.1f} s")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump([group._asdict() for group in duplicates], f, ensure_ascii=False, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
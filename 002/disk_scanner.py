@@ -0,0 +1,225 @@
+"""磁盘容量和目录占用扫描
+
+容量来自 shutil.disk_usage；目录占用由多个线程并行 os.scandir 统计，
+按扫描根目录下的一级子目录分别累计。待扫描的目录放在一个栈里按深度优先处理，
+内存中只保存尚未扫描的目录，不保存整棵目录树，几百万个文件也不会占用太多内存。
+扫描在后台线程进行，界面随时可以用 snapshot() 取得当前的部分结果。
+传入 scan_cache.ScanCache 时，修改时间没变的目录直接使用上次扫描的结果。
+"""
+import os
+import re
+import shutil
+import sys
+import sqlite3
+import threading
+from collections import namedtuple
+
+# 不统计的虚拟文件系统
+_PSEUDO_FILESYSTEMS = {
+    "proc", "sysfs", "devpts", "devtmpfs", "cgroup", "cgroup2", "securityfs", "pstore", "bpf",
+    "tracefs", "debugfs", "mqueue", "hugetlbfs", "configfs", "fusectl", "autofs", "binfmt_misc",
+    "nsfs", "rpc_pipefs", "efivarfs", "selinuxfs",
+}
+
+# 扫描根目录下直接存放的文件归入这一项
+ROOT_FILES = "（根目录下的文件）"
+
+# /proc/mounts 中的八进制转义
+_OCTAL_ESCAPE = re.compile(rb"\\([0-7]{3})")
+
+DiskUsage = namedtuple("DiskUsage", "total used free")
+ScanSnapshot = namedtuple("ScanSnapshot", "files directories bytes errors buckets done")
+
+def list_mount_points():
+    """列出可选择的磁盘：Windows 上为各盘符，其他系统为已挂载的实际文件系统"""
+    if sys.platform == "win32":
+        if hasattr(os, "listdrives"):
+            return os.listdrives()
+        return [f"{letter}:\\" for letter in "ABCDEFGHIJKLMNOPQRSTUVWXYZ" if os.path.exists(f"{letter}:\\")]
+    mount_points = []
+    try:
+        with open("/proc/self/mounts", "rb") as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) >= 3 and os.fsdecode(fields[2]) not in _PSEUDO_FILESYSTEMS:
+                    # /proc/mounts 中空格等字符写作八进制转义（如 \040），其余字节原样保留，
+                    # 在字节上还原转义后再按文件系统编码解码，中文目录名才不会乱码
+                    path = os.fsdecode(_OCTAL_ESCAPE.sub(lambda m: bytes([int(m.group(1), 8)]), fields[1]))
+                    if path not in mount_points:
+                        mount_points.append(path)
+    except OSError:
+        mount_points.append("/")
+        if os.path.isdir("/Volumes"):
+            mount_points.extend(os.path.join("/Volumes", name) for name in sorted(os.listdir("/Volumes")))
+    return mount_points
+
+def disk_usage(path):
+    """返回 path 所在磁盘的总容量、已用和可用字节数"""
+    usage = shutil.disk_usage(path)
+    return DiskUsage(usage.total, usage.used, usage.free)
+
+def format_size(size):
+    """把字节数格式化为 B/KB/MB/GB/TB"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+class DirectoryScanner:
+    """并行统计目录占用
+
+    root 下每个一级子目录为一项，root 中直接存放的文件合为 ROOT_FILES 一项。
+    不跟随符号链接，不进入挂载在其下的其他文件系统（与 du -x 相同）。
+    cache 为 ScanCache 时使用并更新增量缓存，缓存打不开时按无缓存扫描。
+    """
+    def __init__(self, root, workers=None, cache=None):
+        self.root = root
+        self.workers = workers or min(32, (os.cpu_count() or 1) * 4)
+        self._lock = threading.Condition()
+        self._stack = []
+        # 根目录由第一个工作线程扫描，扫描完之前其他线程等待
+        self._active = 1
+        self._cancelled = False
+        self._threads = []
+        self._exited = 0
+        self._buckets = {}
+        self._files = 0
+        self._directories = 0
+        self._bytes = 0
+        self._errors = 0
+        self._device = 0
+        self._cache = None
+        self._cache_source = cache
+
+    def start(self):
+        """在后台线程中开始扫描；包括根目录在内都不在调用线程中读盘，界面不会卡住"""
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker, args=(index == 0,), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def wait(self, timeout=None):
+        """等待扫描结束，返回最终结果"""
+        for thread in self._threads:
+            thread.join(timeout)
+        return self.snapshot()
+
+    def cancel(self):
+        with self._lock:
+            self._cancelled = True
+            self._lock.notify_all()
+
+    @property
+    def running(self):
+        return any(thread.is_alive() for thread in self._threads)
+
+    def snapshot(self):
+        """当前的部分结果，各项按占用从大到小排列"""
+        with self._lock:
+            buckets = sorted(self._buckets.items(), key=lambda item: item[1], reverse=True)
+            done = not self._stack and self._active == 0 or self._cancelled
+            return ScanSnapshot(self._files, self._directories, self._bytes, self._errors, buckets, done)
+
+    def _scan_root(self):
+        """扫描根目录本身：一级子目录各自成为一项，入栈等待工作线程处理
+
+        慢速 U 盘上 stat 根目录、打开缓存都可能很慢，所以也放在工作线程中。
+        """
+        try:
+            self._device = os.stat(self.root).st_dev
+        except OSError:
+            self._device = 0
+        if self._cache_source is not None:
+            try:
+                self._cache = self._cache_source.open_volume(self.root)
+            except (OSError, sqlite3.Error):
+                pass
+        files, size, subdirs, errors = self._scan_directory(self.root, "")
+        with self._lock:
+            self._buckets[ROOT_FILES] = size
+            self._files += files
+            self._bytes += size
+            self._errors += errors
+            self._directories += 1
+            for name in subdirs:
+                self._buckets[name] = 0
+                self._stack.append((os.path.join(self.root, name), name, name))
+            self._active -= 1
+            self._lock.notify_all()
+
+    def _worker(self, scan_root=False):
+        if scan_root:
+            self._scan_root()
+        while True:
+            with self._lock:
+                while not self._stack and self._active > 0 and not self._cancelled:
+                    self._lock.wait()
+                if self._cancelled or not self._stack:
+                    self._lock.notify_all()
+                    self._exited += 1
+                    last = self._exited == self.workers
+                    break
+                path, relative, bucket = self._stack.pop()
+                self._active += 1
+
+            files, size, subdirs, errors = self._scan_directory(path, relative)
+
+            with self._lock:
+                self._buckets[bucket] += size
+                self._files += files
+                self._bytes += size
+                self._errors += errors
+                self._directories += 1
+                self._stack.extend((os.path.join(path, name), f"{relative}/{name}", bucket) for name in subdirs)
+                self._active -= 1
+                self._lock.notify_all()
+        # 最后一个退出的线程写入缓存；取消时已扫描的目录同样有效
+        if last and self._cache is not None:
+            self._cache.finish()
+
+    def _scan_directory(self, path, relative):
+        """统计一个目录中文件的个数和大小，返回 (文件数, 字节数, 子目录名列表, 错误数)
+
+        relative 为相对扫描根目录、以 / 分隔的路径，用作缓存的键。
+        """
+        if self._cache is None:
+            return self._list_directory(path)
+        try:
+            stat = os.stat(path, follow_symlinks=False)
+        except OSError:
+            return 0, 0, [], 1
+        if self._device and stat.st_dev and stat.st_dev != self._device:
+            # 上次扫描后这里挂载了其他文件系统
+            return 0, 0, [], 0
+        cached, old_subdirs = self._cache.lookup(relative, stat.st_ino, stat.st_mtime_ns)
+        if cached is not None:
+            files, size, subdirs = cached
+            return files, size, subdirs, 0
+        files, size, subdirs, errors = self._list_directory(path)
+        if not errors:
+            self._cache.store(relative, stat.st_ino, stat.st_mtime_ns, files, size, subdirs, old_subdirs)
+        return files, size, subdirs, errors
+
+    def _list_directory(self, path):
+        """列出目录并 stat 其中每个文件"""
+        files = size = errors = 0
+        subdirs = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            device = entry.stat(follow_symlinks=False).st_dev
+                            # Windows 上 scandir 不提供设备号（为0），此时不做判断
+                            if not device or not self._device or device == self._device:
+                                subdirs.append(entry.name)
+                        else:
+                            size += entry.stat(follow_symlinks=False).st_size
+                            files += 1
+                    except OSError:
+                        errors += 1
+        except OSError:
+            errors += 1
+        return files, size, subdirs, errors
@@ -0,0 +1,329 @@
+"""磁盘读写性能测试
+
+在选定的目录中创建一个测试文件，依次测量：
+顺序写、顺序读（大块缓冲区，MB/s），不同队列深度下的 4K 随机读、随机写（IOPS，
+每个队列深度一个线程池，各线程用 os.pread/os.pwrite 同时读写），以及写 4K 后 fsync 的延迟。
+写完后尽量把测试文件从页缓存中清掉（posix_fadvise），读测试才会真正读盘；
+不支持的系统上读的结果会偏高。测试结束后删除测试文件。
+
+    python io_benchmark.py /dev/shm --size 64M --duration 1 --json result.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+MB = 1024 * 1024
+
+# 随机读写的块大小
+RANDOM_BLOCK = 4096
+
+# 进度回调的最短间隔（秒）
+PROGRESS_INTERVAL = 0.1
+
+_BINARY = getattr(os, "O_BINARY", 0)
+
+class BenchmarkCancelled(Exception):
+    pass
+
+def parse_size(text):
+    """解析 64M、1G、4096 这样的大小"""
+    units = {"K": 1024, "M": MB, "G": 1024 * MB}
+    text = text.strip().upper().rstrip("B")
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+def _pread(fd, size, offset):
+    if hasattr(os, "pread"):
+        return os.pread(fd, size, offset)
+    # Windows 没有 pread；每个线程用自己的文件描述符，seek 后读不会互相干扰
+    os.lseek(fd, offset, os.SEEK_SET)
+    return os.read(fd, size)
+
+def _pwrite(fd, data, offset):
+    if hasattr(os, "pwrite"):
+        return os.pwrite(fd, data, offset)
+    os.lseek(fd, offset, os.SEEK_SET)
+    return os.write(fd, data)
+
+def _drop_cache(fd):
+    """让系统丢弃文件在页缓存中的内容，返回是否成功"""
+    if not hasattr(os, "posix_fadvise"):
+        return False
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        return True
+    except OSError:
+        return False
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)] if values else 0.0
+
+class IOBenchmark:
+    """在 directory 中测试读写性能
+
+    progress(比例, 说明) 在运行测试的线程中调用，间隔不小于 PROGRESS_INTERVAL；
+    界面需要自己转到主线程更新。
+    """
+    def __init__(self, directory, file_size=256 * MB, block_size=4 * MB, duration=2.0,
+                 queue_depths=(1, 4, 16, 32), fsync_count=100, progress=None):
+        self.directory = directory
+        self.file_size = file_size
+        self.block_size = block_size
+        self.duration = duration
+        self.queue_depths = tuple(queue_depths)
+        self.fsync_count = fsync_count
+        self.progress = progress
+        self.results = []
+        self._cancelled = threading.Event()
+        self._phase = 0
+        self._phases = 3 + 2 * len(self.queue_depths)
+        self._last_report = 0.0
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def _check(self):
+        if self._cancelled.is_set():
+            raise BenchmarkCancelled()
+
+    def _report(self, fraction, text, force=False):
+        """报告当前测试的进度（0 到 1），换算成整个测试的进度"""
+        now = time.perf_counter()
+        if self.progress is None or not force and now - self._last_report < PROGRESS_INTERVAL:
+            return
+        self._last_report = now
+        self.progress(min((self._phase + fraction) / self._phases, 1.0), text)
+
+    def _record(self, test, seconds, operations, block_size, total_bytes, queue_depth=1, latencies=None, **extra):
+        """记录一项结果并进入下一项测试"""
+        result = {
+            "test": test,
+            "queue_depth": queue_depth,
+            "block_size": block_size,
+            "operations": operations,
+            "bytes": total_bytes,
+            "seconds": round(seconds, 6),
+        }
+        result["mb_per_s"] = round(total_bytes / MB / seconds, 2) if seconds else 0.0
+        result["iops"] = round(operations / seconds, 1) if seconds else 0.0
+        if latencies:
+            result["latency_ms"] = {
+                "mean": round(sum(latencies) / len(latencies) * 1000, 3),
+                "p50": round(_percentile(latencies, 0.5) * 1000, 3),
+                "p99": round(_percentile(latencies, 0.99) * 1000, 3),
+                "max": round(max(latencies) * 1000, 3),
+            }
+        result.update(extra)
+        self.results.append(result)
+        self._phase += 1
+        return result
+
+    def run(self):
+        """运行全部测试，返回报告（可直接写成 JSON）；取消时抛出 BenchmarkCancelled"""
+        free = shutil.disk_usage(self.directory).free
+        # 测试文件最多占用剩余空间的一半
+        file_size = min(self.file_size, free // 2) // RANDOM_BLOCK * RANDOM_BLOCK
+        if file_size < RANDOM_BLOCK * 16:
+            raise OSError(f"剩余空间不足，无法测试: {self.directory}")
+        self.file_size = file_size
+        started = time.time()
+        fd, path = tempfile.mkstemp(prefix=".io_benchmark_", dir=self.directory)
+        os.close(fd)
+        try:
+            self._sequential_write(path)
+            self._sequential_read(path)
+            for depth in self.queue_depths:
+                self._random(path, depth, write=False)
+            for depth in self.queue_depths:
+                self._random(path, depth, write=True)
+            self._fsync_latency(path)
+        finally:
+            os.remove(path)
+        self._report(1.0, "测试完成", force=True)
+        return {
+            "directory": os.path.abspath(self.directory),
+            "platform": platform.platform(),
+            "started": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(started)),
+            "file_size": self.file_size,
+            "results": self.results,
+        }
+
+    def _sequential_write(self, path):
+        buffer = memoryview(os.urandom(self.block_size))
+        fd = os.open(path, os.O_WRONLY | _BINARY)
+        try:
+            written = 0
+            start = time.perf_counter()
+            while written < self.file_size:
+                self._check()
+                written += os.write(fd, buffer[:self.file_size - written])
+                self._report(written / self.file_size, f"顺序写入 {written // MB}/{self.file_size // MB} MB")
+            # 写入的数据落盘才算完成
+            os.fsync(fd)
+            seconds = time.perf_counter() - start
+            _drop_cache(fd)
+        finally:
+            os.close(fd)
+        self._record("sequential_write", seconds, -(-written // self.block_size), self.block_size, written)
+
+    def _sequential_read(self, path):
+        fd = os.open(path, os.O_RDONLY | _BINARY)
+        try:
+            uncached = _drop_cache(fd)
+            read = 0
+            start = time.perf_counter()
+            while True:
+                self._check()
+                data = os.read(fd, self.block_size)
+                if not data:
+                    break
+                read += len(data)
+                self._report(read / self.file_size, f"顺序读取 {read // MB}/{self.file_size // MB} MB")
+            seconds = time.perf_counter() - start
+        finally:
+            os.close(fd)
+        self._record("sequential_read", seconds, -(-read // self.block_size), self.block_size, read,
+                     cache_dropped=uncached)
+
+    def _random(self, path, depth, write):
+        """depth 个线程同时做 4K 随机读（或写），持续 duration 秒"""
+        name = "随机写入" if write else "随机读取"
+        fd = os.open(path, os.O_RDWR | _BINARY)
+        try:
+            uncached = _drop_cache(fd)
+            deadline = time.perf_counter() + self.duration
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=depth) as pool:
+                futures = [pool.submit(self._random_worker, path, write, deadline, seed)
+                           for seed in range(depth)]
+                pending = futures
+                while pending:
+                    _, pending = wait(pending, timeout=PROGRESS_INTERVAL)
+                    elapsed = time.perf_counter() - start
+                    self._report(min(elapsed / self.duration, 1.0), f"{name} 4K，队列深度 {depth}")
+                operations = sum(future.result() for future in futures)
+            if write:
+                # 与顺序写一样，把写入的数据落盘计入时间
+                os.fsync(fd)
+            seconds = time.perf_counter() - start
+        finally:
+            os.close(fd)
+        self._check()
+        self._record("random_write" if write else "random_read", seconds, operations, RANDOM_BLOCK,
+                     operations * RANDOM_BLOCK, queue_depth=depth, cache_dropped=uncached)
+
+    def _random_worker(self, path, write, deadline, seed):
+        fd = os.open(path, (os.O_RDWR if write else os.O_RDONLY) | _BINARY)
+        try:
+            rng = random.Random(seed)
+            blocks = self.file_size // RANDOM_BLOCK
+            data = os.urandom(RANDOM_BLOCK)
+            operations = 0
+            while time.perf_counter() < deadline and not self._cancelled.is_set():
+                offset = rng.randrange(blocks) * RANDOM_BLOCK
+                if write:
+                    _pwrite(fd, data, offset)
+                else:
+                    _pread(fd, RANDOM_BLOCK, offset)
+                operations += 1
+            return operations
+        finally:
+            os.close(fd)
+
+    def _fsync_latency(self, path):
+        """每次写入 4K 后 fsync，记录每次的耗时"""
+        data = os.urandom(RANDOM_BLOCK)
+        latencies = []
+        fd = os.open(path, os.O_WRONLY | _BINARY)
+        try:
+            start = time.perf_counter()
+            for i in range(self.fsync_count):
+                self._check()
+                began = time.perf_counter()
+                _pwrite(fd, data, i * RANDOM_BLOCK % self.file_size)
+                os.fsync(fd)
+                latencies.append(time.perf_counter() - began)
+                self._report((i + 1) / self.fsync_count, f"fsync 延迟 {i + 1}/{self.fsync_count}")
+            seconds = time.perf_counter() - start
+        finally:
+            os.close(fd)
+        self._record("fsync", seconds, len(latencies), RANDOM_BLOCK, len(latencies) * RANDOM_BLOCK,
+                     latencies=latencies)
+
+# 汇总表中各测试的名称
+TEST_NAMES = {
+    "sequential_write": "顺序写入",
+    "sequential_read": "顺序读取",
+    "random_read": "4K 随机读",
+    "random_write": "4K 随机写",
+    "fsync": "4K 写入 + fsync",
+}
+
+def summary_rows(report):
+    """汇总为 (测试, 结果) 两列"""
+    rows = []
+    for result in report["results"]:
+        name = TEST_NAMES.get(result["test"], result["test"])
+        if result["test"].startswith("sequential"):
+            rows.append((name, f"{result['mb_per_s']:.1f} MB/s"))
+        elif result["test"] == "fsync":
+            latency = result["latency_ms"]
+            rows.append((name, f"平均 {latency['mean']:.2f} ms，p99 {latency['p99']:.2f} ms"))
+        else:
+            rows.append((f"{name} QD{result['queue_depth']}",
+                         f"{result['iops']:.0f} IOPS，{result['mb_per_s']:.1f} MB/s"))
+    return rows
+
+def format_summary(report):
+    """汇总表文本"""
+    rows = summary_rows(report)
+    width = max(len(name) for name, _ in rows) + 2
+    lines = [f"{report['directory']}，测试文件 {report['file_size'] // MB} MB"]
+    lines.extend(f"{name:<{width}}{value}" for name, value in rows)
+    return "\n".join(lines)
+
+def export_json(report, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="测试目录所在磁盘的顺序、随机读写性能和 fsync 延迟")
+    parser.add_argument("directory", help="测试文件所在的目录（可以是 tmpfs 或 loop 设备的挂载点）")
+    parser.add_argument("--size", type=parse_size, default=256 * MB, help="测试文件大小，如 64M、1G")
+    parser.add_argument("--block", type=parse_size, default=4 * MB, help="顺序读写的缓冲区大小")
+    parser.add_argument("--duration", type=float, default=2.0, help="每个随机读写测试的秒数")
+    parser.add_argument("--depths", default="1,4,16,32", help="随机读写的队列深度，逗号分隔")
+    parser.add_argument("--fsync-count", type=int, default=100, help="fsync 延迟测试的次数")
+    parser.add_argument("--json", help="把结果写入这个 JSON 文件")
+    args = parser.parse_args(argv)
+
+    def progress(fraction, text):
+        print(f"\r{fraction * 100:5.1f}%  {text:<40}", end="", file=sys.stderr, flush=True)
+
+    benchmark = IOBenchmark(
+        args.directory, args.size, args.block, args.duration,
+        [int(depth) for depth in args.depths.split(",")], args.fsync_count, progress
+    )
+    try:
+        report = benchmark.run()
+    except KeyboardInterrupt:
+        print("\n已取消", file=sys.stderr)
+        return 1
+    print(file=sys.stderr)
+    print(format_summary(report))
+    if args.json:
+        export_json(report, args.json)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""目录扫描的增量缓存
+
+每个目录在 SQLite 中保存一行：inode、修改时间、直接包含的文件数和字节数、子目录名。
+再次扫描时只对每个目录 stat 一次，inode 和修改时间都没变的目录直接使用缓存，
+不再列目录、也不再 stat 其中的每个文件；只有修改时间变了的目录才重新列出。
+注意目录的修改时间只在增删、重命名其中的条目时改变，原地改写文件不会更新，
+需要精确结果时可以不使用缓存重新扫描。
+
+磁盘（卷）以扫描根目录区分，设备号、根目录 inode 或总容量变化时视为换了设备，丢弃旧缓存。
+缓存的卷数和目录行数有上限，超出时淘汰最久未扫描的卷。
+
+    python scan_cache.py --files 1000000    # 在临时目录生成文件树，对比冷、热扫描耗时
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from contextlib import closing, contextmanager
+
+# 缓存文件的默认位置
+DEFAULT_PATH = os.path.join(
+    os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "storage_converter",
+    "scan_cache.sqlite3"
+)
+
+# 修改时间距现在不到这么多秒的目录不写入缓存：同一时间刻度内的后续修改无法通过修改时间发现
+_RACY_SECONDS = 2
+
+# 攒够这么多行再写入一次
+_BATCH_ROWS = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS volumes (
+    volume_id INTEGER PRIMARY KEY,
+    root TEXT UNIQUE NOT NULL,
+    device INTEGER NOT NULL,
+    root_inode INTEGER NOT NULL,
+    capacity INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS directories (
+    volume_id INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    inode INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    files INTEGER NOT NULL,
+    file_bytes INTEGER NOT NULL,
+    subdirs TEXT NOT NULL,
+    PRIMARY KEY (volume_id, path)
+) WITHOUT ROWID;
+"""
+
+class ScanCache:
+    """缓存文件；每次扫描用 open_volume 取得对应卷的缓存"""
+    def __init__(self, path=DEFAULT_PATH, max_volumes=8, max_directories=2000000):
+        self.path = path
+        self.max_volumes = max_volumes
+        self.max_directories = max_directories
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._transaction() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(_SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+
+    @contextmanager
+    def _transaction(self):
+        """打开一个连接，在事务中执行后关闭"""
+        with closing(self._connect()) as db, db:
+            yield db
+
+    def open_volume(self, root):
+        """取得 root 的缓存；设备变化时清空该卷原有的记录"""
+        root = os.path.abspath(root)
+        stat = os.stat(root)
+        identity = (stat.st_dev, stat.st_ino, shutil.disk_usage(root).total)
+        with self._transaction() as db:
+            row = db.execute(
+                "SELECT volume_id, device, root_inode, capacity FROM volumes WHERE root = ?", (root,)
+            ).fetchone()
+            if row is None:
+                volume_id = db.execute(
+                    "INSERT INTO volumes (root, device, root_inode, capacity, last_used) VALUES (?, ?, ?, ?, ?)",
+                    (root, *identity, time.time())
+                ).lastrowid
+            else:
+                volume_id = row[0]
+                if tuple(row[1:]) != identity:
+                    db.execute("DELETE FROM directories WHERE volume_id = ?", (volume_id,))
+                    db.execute(
+                        "UPDATE volumes SET device = ?, root_inode = ?, capacity = ? WHERE volume_id = ?",
+                        (*identity, volume_id)
+                    )
+        return VolumeCache(self, volume_id)
+
+    def evict(self, keep_volume_id):
+        """卷数或目录行数超出上限时，从最久未使用的卷开始删除（不删除 keep_volume_id）"""
+        with self._transaction() as db:
+            volumes = db.execute(
+                "SELECT v.volume_id, (SELECT COUNT(*) FROM directories d WHERE d.volume_id = v.volume_id) "
+                "FROM volumes v ORDER BY v.last_used DESC"
+            ).fetchall()
+            total = sum(count for _, count in volumes)
+            while volumes and (len(volumes) > self.max_volumes or total > self.max_directories):
+                volume_id, count = volumes.pop()
+                if volume_id == keep_volume_id:
+                    break
+                db.execute("DELETE FROM directories WHERE volume_id = ?", (volume_id,))
+                db.execute("DELETE FROM volumes WHERE volume_id = ?", (volume_id,))
+                total -= count
+
+class VolumeCache:
+    """一个卷的目录缓存，可被多个扫描线程同时使用
+
+    路径是相对于扫描根目录、以 / 分隔的字符串，根目录本身为空字符串。
+    """
+    def __init__(self, cache, volume_id):
+        self.cache = cache
+        self.volume_id = volume_id
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._rows = []
+        self._removed = []
+
+    def _reader(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = self.cache._connect()
+        return db
+
+    def lookup(self, path, inode, mtime_ns):
+        """inode 和修改时间与缓存一致时返回 (文件数, 字节数, 子目录名列表)，否则返回 (None, 旧的子目录名列表)"""
+        try:
+            row = self._reader().execute(
+                "SELECT inode, mtime_ns, files, file_bytes, subdirs FROM directories WHERE volume_id = ? AND path = ?",
+                (self.volume_id, path)
+            ).fetchone()
+        except sqlite3.Error:
+            row = None
+        if row is None:
+            return None, []
+        subdirs = row[4].split("\0") if row[4] else []
+        if row[0] == inode and row[1] == mtime_ns:
+            return (row[2], row[3], subdirs), subdirs
+        return None, subdirs
+
+    def store(self, path, inode, mtime_ns, files, file_bytes, subdirs, old_subdirs=()):
+        """记录重新列出的目录；旧记录中已不存在的子目录连同其下所有记录一起删除"""
+        removed = set(old_subdirs).difference(subdirs)
+        with self._lock:
+            if time.time_ns() - mtime_ns > _RACY_SECONDS * 1000000000:
+                self._rows.append((self.volume_id, path, inode, mtime_ns, files, file_bytes, "\0".join(subdirs)))
+            self._removed.extend(f"{path}/{name}" if path else name for name in removed)
+            if len(self._rows) + len(self._removed) >= _BATCH_ROWS:
+                self._flush()
+
+    def _flush(self):
+        rows, self._rows = self._rows, []
+        removed, self._removed = self._removed, []
+        # 写入失败（如缓存文件被锁住）只是少缓存一些目录，不影响扫描结果
+        try:
+            with self.cache._transaction() as db:
+                for path in removed:
+                    # 以 / 分隔的子路径都在 [path + '/', path + '0') 之间（'0' 紧跟在 '/' 之后）
+                    db.execute(
+                        "DELETE FROM directories WHERE volume_id = ? AND (path = ? OR (path >= ? AND path < ?))",
+                        (self.volume_id, path, path + "/", path + "0")
+                    )
+                db.executemany("INSERT OR REPLACE INTO directories VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        except sqlite3.Error:
+            pass
+
+    def finish(self):
+        """扫描结束：写入剩余记录，更新使用时间并淘汰旧卷"""
+        with self._lock:
+            self._flush()
+        try:
+            with self.cache._transaction() as db:
+                db.execute("UPDATE volumes SET last_used = ? WHERE volume_id = ?", (time.time(), self.volume_id))
+            self.cache.evict(self.volume_id)
+            # 把 WAL 中的改动写回主文件，缓存文件保持紧凑
+            with self.cache._transaction() as db:
+                db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except sqlite3.Error:
+            pass
+
+def make_tree(root, files, per_directory=100, fan_out=100):
+    """生成 files 个空文件，每个目录 per_directory 个文件，目录按 fan_out 分两层"""
+    created = 0
+    directory_index = 0
+    while created < files:
+        directory = os.path.join(root, f"d{directory_index // fan_out:04d}", f"d{directory_index % fan_out:04d}")
+        os.makedirs(directory, exist_ok=True)
+        for i in range(min(per_directory, files - created)):
+            with open(os.path.join(directory, f"f{i:05d}"), "wb") as f:
+                f.write(b"x" * (i % 7))
+        created += per_directory
+        directory_index += 1
+    return directory_index
+
+def main(argv=None):
+    from disk_scanner import DirectoryScanner
+
+    parser = argparse.ArgumentParser(description="对比无缓存、冷缓存、热缓存和部分目录变化后的扫描耗时")
+    parser.add_argument("--files", type=int, default=1000000, help="生成的文件数")
+    parser.add_argument("--per-directory", type=int, default=100, help="每个目录的文件数")
+    parser.add_argument("--workers", type=int, help="扫描线程数")
+    parser.add_argument("--dir", help="在这个目录下生成文件树（默认系统临时目录）")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as workspace:
+        tree = os.path.join(workspace, "tree")
+        start = time.perf_counter()
+        directories = make_tree(tree, args.files, args.per_directory)
+        print(f"生成 {args.files} 个文件、{directories} 个目录: {time.perf_counter() - start:.1f} s")
+        # 生成的目录修改时间都是刚刚，先调早，避免被当作“可能还在变化”而不写入缓存
+        past = time.time() - 60
+        for path, _, _ in os.walk(tree):
+            os.utime(path, (past, past))
+
+        cache = ScanCache(os.path.join(workspace, "cache.sqlite3"))
+
+        def timed(label, use_cache=True):
+            start = time.perf_counter()
+            result = DirectoryScanner(tree, args.workers, cache if use_cache else None).start().wait()
+            print(f"{label:<16}{time.perf_counter() - start:>8.2f} s  {result.files} 个文件  {result.bytes} 字节")
+            return result
+
+        timed("无缓存", use_cache=False)
+        timed("冷缓存（首次）")
+        timed("热缓存")
+        # 1% 的目录新增一个文件
+        for index, path in enumerate(sorted(os.path.join(tree, a, b) for a in os.listdir(tree)
+                                            for b in os.listdir(os.path.join(tree, a)))):
+            if index % 100 == 0:
+                with open(os.path.join(path, "new"), "wb") as f:
+                    f.write(b"new")
+                os.utime(path, (past + 1, past + 1))
+        timed("1% 目录变化后")
+        print(f"缓存文件大小: {os.path.getsize(cache.path) / 1024 / 1024:.1f} MB")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
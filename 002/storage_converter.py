@@ -1,9 +1,22 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 from PIL import Image, ImageTk
-import time
+import os
+import sqlite3
 import threading
 
+from disk_scanner import DirectoryScanner, disk_usage, format_size, list_mount_points
+from dedup import DedupCancelled, DuplicateFinder, STAGES
+from io_benchmark import BenchmarkCancelled, IOBenchmark, export_json, format_summary, summary_rows
+from scan_cache import ScanCache
+from ui_bus import UpdateBus
+
+# 目录占用列表显示的项数
+BREAKDOWN_ROWS = 8
+
+# 查重结果最多列出的组数
+DUPLICATE_ROWS = 200
+
 class StorageConverterApp:
     def __init__(self, root):
         self.root = root
@@ -17,7 +30,7 @@ class StorageConverterApp:
         
         # 设置初始窗口大小
         window_width = 500
-        window_height = 400  # 调整初始高度为400
+        window_height = 650  # 调整初始高度为650，容纳目录占用列表和查重按钮
         
         # 获取屏幕尺寸
         screen_width = root.winfo_screenwidth()
@@ -34,7 +47,7 @@ class StorageConverterApp:
         self.root.resizable(True, True)
         
         # 设置最小窗口大小
-        self.root.minsize(300, 350)  # 调整最小高度为350
+        self.root.minsize(300, 550)  # 调整最小高度为550
         
         # 创建主框架，使用权重使其能随窗口拉伸
         main_frame = tk.Frame(root)
@@ -70,14 +83,21 @@ class StorageConverterApp:
         info_frame = tk.Frame(device_frame)
         info_frame.pack(side=tk.LEFT, fill=tk.X, expand=True)
         
-        # 显示设备标签
-        self.storage_label = tk.Label(
+        # 选择磁盘：下拉列出已挂载的磁盘，也可以直接输入目录后回车
+        mount_points = list_mount_points()
+        default_mount = os.path.abspath(os.sep)
+        self.mount_var = tk.StringVar(
+            value=default_mount if default_mount in mount_points or not mount_points else mount_points[0]
+        )
+        self.storage_label = ttk.Combobox(
             info_frame,
-            text="U盘 (E:)",
-            font=("Microsoft YaHei", 12),
-            anchor="w"
+            textvariable=self.mount_var,
+            values=mount_points,
+            font=("Microsoft YaHei", 12)
         )
         self.storage_label.pack(fill=tk.X, pady=(4, 2))
+        self.storage_label.bind("<<ComboboxSelected>>", self.select_mount)
+        self.storage_label.bind("<Return>", self.select_mount)
         
         # 存储容量进度条
         self.disk_progress = ttk.Progressbar(
@@ -98,9 +118,22 @@ class StorageConverterApp:
         )
         self.storage_info.pack(fill=tk.X, pady=(2, 0))
         
+        # 目录占用列表：扫描过程中不断更新
+        self.breakdown = ttk.Treeview(
+            main_frame,
+            columns=("name", "size"),
+            show="headings",
+            height=BREAKDOWN_ROWS
+        )
+        self.breakdown.heading("name", text="目录", anchor="w")
+        self.breakdown.heading("size", text="占用", anchor="e")
+        self.breakdown.column("name", anchor="w")
+        self.breakdown.column("size", anchor="e", width=100, stretch=False)
+        self.breakdown.pack(fill=tk.BOTH, expand=True)
+        
         # 创建扩容进度框架
         progress_frame = tk.Frame(main_frame)
-        progress_frame.pack(fill=tk.X, pady=(40, 0))
+        progress_frame.pack(fill=tk.X, pady=(20, 0))
         
         # 扩容进度条
         self.progress_bar = ttk.Progressbar(
@@ -126,6 +159,7 @@ class StorageConverterApp:
                 super().__init__(parent, width=width, height=height, highlightthickness=0, bg=parent.cget('bg'))
                 
                 self.command = command
+                self.text = text
                 
                 # 创建圆角矩形
                 self.create_rounded_rect(0, 0, width, height, corner_radius, fill='#FF6B6B', outline='#FF6B6B')
@@ -164,7 +198,7 @@ class StorageConverterApp:
                 self.create_rounded_rect(0, 0, self.winfo_width(), self.winfo_height(), 10, 
                                       fill='#FF8787', outline='#FF8787')
                 self.create_text(self.winfo_width()/2, self.winfo_height()/2, 
-                               text="开始扩容", fill='white', font=('Microsoft YaHei', 10))
+                               text=self.text, fill='white', font=('Microsoft YaHei', 10))
                 
             def _on_leave(self, event):
                 self.configure(cursor='')
@@ -172,7 +206,7 @@ class StorageConverterApp:
                 self.create_rounded_rect(0, 0, self.winfo_width(), self.winfo_height(), 10,
                                       fill='#FF6B6B', outline='#FF6B6B')
                 self.create_text(self.winfo_width()/2, self.winfo_height()/2,
-                               text="开始扩容", fill='white', font=('Microsoft YaHei', 10))
+                               text=self.text, fill='white', font=('Microsoft YaHei', 10))
         
         # 使用自定义圆角按钮
         self.convert_button = RoundedButton(
@@ -182,7 +216,17 @@ class StorageConverterApp:
             command=self.start_conversion,
             text="开始扩容"
         )
-        self.convert_button.pack(pady=(40, 30))
+        self.convert_button.pack(pady=(20, 10))
+        
+        # 查找重复文件按钮
+        self.dedup_button = RoundedButton(
+            main_frame,
+            width=200,
+            height=40,
+            command=self.start_dedup,
+            text="查找重复文件"
+        )
+        self.dedup_button.pack(pady=(0, 10))
         
         # 设置进度条样式
         style = ttk.Style()
@@ -204,47 +248,240 @@ class StorageConverterApp:
         self.disk_progress["value"] = 0
         self.progress_bar["value"] = 0
         
-        # 转换状态标志
+        # 转换状态标志（读写测试和查找重复文件共用），以及进行中的任务
         self.is_converting = False
+        self.benchmark = None
+        self.finder = None
+        self.worker_thread = None
+        # 工作线程的进度和结果经由总线回到界面线程
+        self.bus = UpdateBus(self.root)
+        self.bus.start()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # 目录扫描器，以及用于估算扫描进度的已用容量
+        self.scanner = None
+        self.usage = None
+        # 目录占用的增量缓存，再次扫描同一磁盘时只重新列出有变化的目录
+        try:
+            self.scan_cache = ScanCache()
+        except (OSError, sqlite3.Error):
+            self.scan_cache = None
+        self.show_usage(self.mount_var.get())
+        
+    def show_usage(self, path):
+        """显示磁盘的实际容量和已用比例"""
+        try:
+            self.usage = disk_usage(path)
+        except OSError as e:
+            self.progress_label.config(text=f"无法读取磁盘信息: {e}")
+            return False
+        total, used, free = self.usage
+        self.disk_progress["value"] = used / total * 100 if total else 0
+        self.storage_info.config(text=f"{format_size(free)} 可用，共 {format_size(total)}")
+        return True
+        
+    def select_mount(self, event=None):
+        """选择磁盘或目录后刷新容量，并在后台统计各目录的占用"""
+        path = self.mount_var.get().strip()
+        if not os.path.isdir(path):
+            self.progress_label.config(text=f"目录不存在: {path}")
+            return
+        if not self.show_usage(path):
+            return
+        if self.scanner is not None:
+            self.scanner.cancel()
+        self.breakdown.heading("name", text="目录")
+        self.breakdown.heading("size", text="占用")
+        self.breakdown.column("size", width=100)
+        self.breakdown.delete(*self.breakdown.get_children())
+        self.scanner = DirectoryScanner(path, cache=self.scan_cache).start()
+        self.root.after(100, self.poll_scan, self.scanner)
+        
+    def poll_scan(self, scanner):
+        """定时读取扫描的部分结果，更新进度条和目录占用列表"""
+        if scanner is not self.scanner:
+            return
+        snapshot = scanner.snapshot()
+        self.breakdown.delete(*self.breakdown.get_children())
+        for name, size in snapshot.buckets[:BREAKDOWN_ROWS]:
+            self.breakdown.insert("", tk.END, values=(name, format_size(size)))
+            
+        # 扩容进行中时进度条和提示留给扩容使用
+        if not self.is_converting:
+            summary = f"{snapshot.files} 个文件，{format_size(snapshot.bytes)}"
+            if snapshot.errors:
+                summary += f"，{snapshot.errors} 项无法读取"
+            if snapshot.done:
+                self.progress_bar["value"] = 100
+                self.progress_label.config(text=f"扫描完成：{summary}")
+            else:
+                # 已用容量只是估计值（包含其他目录和文件系统开销），进度最多显示到 99%
+                used = self.usage.used if self.usage else 0
+                self.progress_bar["value"] = min(snapshot.bytes / used * 100, 99) if used else 0
+                self.progress_label.config(text=f"正在扫描：{summary}")
+        if not snapshot.done:
+            self.root.after(100, self.poll_scan, scanner)
         
     def start_conversion(self):
         if not self.is_converting:
+            path = self.mount_var.get().strip()
+            if not os.path.isdir(path):
+                self.progress_label.config(text=f"目录不存在: {path}")
+                return
+            # 扩容时停止正在进行的目录扫描
+            if self.scanner is not None:
+                self.scanner.cancel()
+                self.scanner = None
             self.is_converting = True
             self.convert_button.configure(state='disabled')
+            self.dedup_button.configure(state='disabled')
             self.progress_label.config(text="正在准备...")
+            # 在选定的磁盘上测试读写性能
+            self.benchmark = IOBenchmark(path, progress=self.report_progress)
             # 启动转换线程
-            threading.Thread(target=self.conversion_process, daemon=True).start()
+            self.worker_thread = threading.Thread(target=self.conversion_process, daemon=True)
+            self.worker_thread.start()
     
     def conversion_process(self):
-        # 模拟转换过程
-        for i in range(101):
-            if not self.is_converting:
-                break
-            self.progress_bar["value"] = i
-            # 更新进度显示
-            if i < 30:
-                self.root.after(0, lambda: self.progress_label.config(text="正在扫描设备..."))
-            elif i < 60:
-                self.root.after(0, lambda: self.progress_label.config(text="正在扩容中..."))
-            elif i < 90:
-                self.root.after(0, lambda: self.progress_label.config(text="正在写入数据..."))
-            time.sleep(0.03)  # 控制进度条速度
-        
-        # 完成转换
+        try:
+            report = self.benchmark.run()
+        except BenchmarkCancelled:
+            return
+        except Exception as e:
+            # 空间不足、无法创建线程、内存不足等，都要让界面恢复可用
+            self.bus.post(None, self.conversion_failed, e)
+            return
+        self.bus.post(None, self.complete_conversion, report)
+    
+    def report_progress(self, fraction, text):
+        """测试线程的进度回调，转到界面线程更新"""
+        self.bus.post("progress", self.show_progress, fraction, text)
+    
+    def show_progress(self, fraction, text):
         if self.is_converting:
-            self.root.after(0, self.complete_conversion)
+            self.progress_bar["value"] = fraction * 100
+            self.progress_label.config(text=text)
     
-    def complete_conversion(self):
-        self.storage_info.config(text="67108864 KB 可用，共 67108864 KB")
+    def conversion_failed(self, error):
+        self.is_converting = False
+        self.convert_button.configure(state='normal')
+        self.dedup_button.configure(state='normal')
+        self.progress_bar["value"] = 0
+        self.progress_label.config(text="准备就绪")
+        messagebox.showerror("错误", f"读写测试失败: {error}")
+    
+    def complete_conversion(self, report):
+        # 把同样的容量换成 KB 显示
+        if self.usage:
+            total, used, free = self.usage
+            self.storage_info.config(text=f"{free // 1024} KB 可用，共 {total // 1024} KB")
+        else:
+            self.storage_info.config(text="67108864 KB 可用，共 67108864 KB")
         self.progress_bar["value"] = 100
         self.progress_label.config(text="扩容完成！")
         self.is_converting = False
         self.convert_button.configure(state='normal')
-        # 显示完成提示
-        messagebox.showinfo("完成", "扩容已完成！")
+        self.dedup_button.configure(state='normal')
+        # 测试结果显示在目录占用列表的位置
+        self.breakdown.heading("name", text="测试")
+        self.breakdown.heading("size", text="结果")
+        self.breakdown.column("size", width=220)
+        self.breakdown.delete(*self.breakdown.get_children())
+        for name, value in summary_rows(report):
+            self.breakdown.insert("", tk.END, values=(name, value))
+        # 显示完成提示，可以导出完整结果
+        if messagebox.askyesno("完成", f"扩容已完成！\n\n{format_summary(report)}\n\n是否导出 JSON 结果？"):
+            path = filedialog.asksaveasfilename(
+                defaultextension=".json",
+                filetypes=[("JSON", "*.json")],
+                initialfile="io_benchmark.json"
+            )
+            if path:
+                try:
+                    export_json(report, path)
+                except OSError as e:
+                    messagebox.showerror("错误", f"无法导出: {e}")
         # 重置进度
         self.progress_bar["value"] = 0
         self.progress_label.config(text="准备就绪")
+    
+    def start_dedup(self):
+        """在选定的磁盘或目录中查找内容相同的文件"""
+        if self.is_converting:
+            return
+        path = self.mount_var.get().strip()
+        if not os.path.isdir(path):
+            self.progress_label.config(text=f"目录不存在: {path}")
+            return
+        if self.scanner is not None:
+            self.scanner.cancel()
+            self.scanner = None
+        self.is_converting = True
+        self.convert_button.configure(state='disabled')
+        self.dedup_button.configure(state='disabled')
+        self.progress_label.config(text="正在查找重复文件...")
+        self.breakdown.heading("name", text="重复文件")
+        self.breakdown.heading("size", text="可释放")
+        self.breakdown.column("size", width=100)
+        self.breakdown.delete(*self.breakdown.get_children())
+        self.finder = DuplicateFinder(path, progress=self.report_dedup_progress)
+        self.worker_thread = threading.Thread(target=self.dedup_process, daemon=True)
+        self.worker_thread.start()
+    
+    def dedup_process(self):
+        try:
+            duplicates = self.finder.run()
+        except DedupCancelled:
+            return
+        except Exception as e:
+            # 进程池中的子进程被杀掉（BrokenProcessPool）、内存不足等，都要让界面恢复可用
+            self.bus.post(None, self.dedup_failed, e)
+            return
+        self.bus.post(None, self.complete_dedup, duplicates)
+    
+    def dedup_failed(self, error):
+        self.is_converting = False
+        self.convert_button.configure(state='normal')
+        self.dedup_button.configure(state='normal')
+        self.progress_bar["value"] = 0
+        self.progress_label.config(text="准备就绪")
+        messagebox.showerror("错误", f"查找重复文件失败: {error}")
+    
+    def report_dedup_progress(self, stage, done, total, reclaimable):
+        """查重线程的进度回调：四个步骤各占进度条的四分之一"""
+        step = STAGES.index(stage)
+        fraction = (step + (done / total if total else 0)) / len(STAGES)
+        count = f"{done}/{total}" if total else f"{done}"
+        text = f"{stage} {count}，可释放 {format_size(reclaimable)}"
+        self.bus.post("progress", self.show_progress, fraction, text)
+    
+    def complete_dedup(self, duplicates):
+        self.is_converting = False
+        self.convert_button.configure(state='normal')
+        self.dedup_button.configure(state='normal')
+        self.progress_bar["value"] = 100
+        reclaimable = sum(group.reclaimable for group in duplicates)
+        self.progress_label.config(
+            text=f"找到 {len(duplicates)} 组重复文件，可释放 {format_size(reclaimable)}"
+        )
+        self.breakdown.delete(*self.breakdown.get_children())
+        for group in duplicates[:DUPLICATE_ROWS]:
+            parent = self.breakdown.insert(
+                "", tk.END, open=True,
+                values=(f"{os.path.basename(group.paths[0])} × {len(group.paths)}", format_size(group.reclaimable))
+            )
+            # 每组下面缩进列出全部文件
+            for path in group.paths:
+                self.breakdown.insert(parent, tk.END, values=(f"    {path}", format_size(group.size)))
+    
+    def on_close(self):
+        # 任务进行中时先停止，读写测试需要删除测试文件，查重需要关闭进程池
+        if self.is_converting:
+            for job in (self.benchmark, self.finder):
+                if job is not None:
+                    job.cancel()
+            self.worker_thread.join(5)
+        self.root.destroy()
 
 if __name__ == "__main__":
     root = tk.Tk()
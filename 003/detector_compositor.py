@@ -0,0 +1,351 @@
+"""检测器动画的离屏合成后端
+
+Compositor 提供场景用到的那部分 tk.Canvas 接口（创建、移动、配置、隐藏、删除元素），
+但元素只记录在显示列表里。每帧 present() 把可见元素按叠放顺序画到一张 PIL RGBA
+帧缓冲上，再一次性贴到真正画布上唯一的 PhotoImage 里，Tk 每帧只重绘一次，不会画到一半被显示。
+可以选择在后台线程合成：Tk 显示上一帧的同时合成下一帧，延迟一帧。
+"""
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageColor, ImageDraw, ImageFont, ImageTk
+
+# 没有指定字体文件时依次尝试的中文字体
+_FALLBACK_FONTS = ('msyh.ttc', 'simhei.ttf', 'NotoSansCJK-Regular.ttc', 'wqy-microhei.ttc')
+
+# 缓存的虚线图形数量上限
+_DASHED_CACHE_SIZE = 256
+
+# tk 锚点到 PIL 文字锚点的对应（多行文字只支持顶部对齐 'a'）
+_TEXT_ANCHORS = {
+    'center': 'mm', 'n': 'ma', 's': 'md', 'e': 'rm', 'w': 'lm',
+    'nw': 'la', 'ne': 'ra', 'sw': 'ld', 'se': 'rd',
+}
+
+class PhotoBuffer:
+    """代替 ImageTk.PhotoImage：只保存 PIL 图片，由合成器画到帧缓冲上"""
+    def __init__(self, image):
+        self.image = image
+
+    def paste(self, image):
+        # 与 PhotoImage.paste 一样复制内容，调用方之后可以继续改写自己的缓冲区
+        self.image = image.copy()
+
+    def width(self):
+        return self.image.width
+
+    def height(self):
+        return self.image.height
+
+class Compositor:
+    """离屏合成的画布
+
+    target 是真正显示的 tk.Canvas，font_file 是绘制文字用的 TrueType 字体文件，
+    threaded 为 True 时在后台线程合成。
+    """
+    def __init__(self, target, width, height, background='#1a1a2e', font_file=None, threaded=False):
+        self.target = target
+        self.width = width
+        self.height = height
+        self.background = ImageColor.getrgb(background) + (255,)
+        self.font_file = font_file
+        self.fonts = {}
+        self.dashed_shapes = {}
+        self.items = {}
+        self.next_id = 1
+        self.photo = ImageTk.PhotoImage(Image.new('RGB', (width, height), background))
+        self.image_item = target.create_image(0, 0, image=self.photo, anchor='nw')
+        self.executor = ThreadPoolExecutor(1) if threaded else None
+        self.pending = None
+
+    # ---- 与 tk.Canvas 相同的接口 ----
+
+    def __getitem__(self, option):
+        return self.target[option]
+
+    def cget(self, option):
+        return self.target.cget(option)
+
+    def winfo_width(self):
+        return self.width
+
+    def winfo_height(self):
+        return self.height
+
+    def _create(self, kind, coords, options):
+        if len(coords) == 1 and isinstance(coords[0], (list, tuple)):
+            coords = coords[0]
+        tags = options.pop('tags', ())
+        if isinstance(tags, str):
+            tags = (tags,)
+        item = self.next_id
+        self.next_id += 1
+        self.items[item] = [kind, list(coords), options, set(tags)]
+        return item
+
+    def create_oval(self, *coords, **options):
+        return self._create('oval', coords, options)
+
+    def create_rectangle(self, *coords, **options):
+        return self._create('rectangle', coords, options)
+
+    def create_line(self, *coords, **options):
+        return self._create('line', coords, options)
+
+    def create_text(self, *coords, **options):
+        return self._create('text', coords, options)
+
+    def create_image(self, *coords, **options):
+        return self._create('image', coords, options)
+
+    def find_withtag(self, spec):
+        """支持元素编号、'all'、单个标签和 'a&&!b' 形式的标签表达式"""
+        if isinstance(spec, int):
+            return (spec,) if spec in self.items else ()
+        if spec == 'all':
+            return tuple(self.items)
+        terms = [(term.startswith('!'), term.lstrip('!')) for term in spec.split('&&')]
+        return tuple(
+            item for item, (_, _, _, tags) in self.items.items()
+            if all((tag in tags) != negate for negate, tag in terms)
+        )
+
+    def find_all(self):
+        return tuple(self.items)
+
+    def coords(self, item, *coords):
+        entry = self.items[self.find_withtag(item)[0]]
+        if not coords:
+            return list(entry[1])
+        if len(coords) == 1 and isinstance(coords[0], (list, tuple)):
+            coords = coords[0]
+        entry[1] = list(coords)
+
+    def itemconfigure(self, spec, **options):
+        for item in self.find_withtag(spec):
+            self.items[item][2].update(options)
+
+    itemconfig = itemconfigure
+
+    def delete(self, *specs):
+        for spec in specs:
+            for item in self.find_withtag(spec):
+                del self.items[item]
+
+    def dtag(self, spec, tag=None):
+        for item in self.find_withtag(spec):
+            self.items[item][3].discard(spec if tag is None else tag)
+
+    def addtag_withtag(self, newtag, spec):
+        for item in self.find_withtag(spec):
+            self.items[item][3].add(newtag)
+
+    def tag_raise(self, spec):
+        for item in self.find_withtag(spec):
+            self.items[item] = self.items.pop(item)
+
+    def update_idletasks(self):
+        """完成这一帧：合成并显示"""
+        self.present()
+
+    # ---- 合成 ----
+
+    def new_photo(self, image):
+        return PhotoBuffer(image)
+
+    def resize(self, width, height):
+        """画布大小变化时换一张新尺寸的帧缓冲和 PhotoImage，丢弃合成中的旧尺寸帧"""
+        if self.pending is not None:
+            self.pending.result()
+            self.pending = None
+        self.width = width
+        self.height = height
+        self.photo = ImageTk.PhotoImage(Image.new('RGB', (width, height), self.background[:3]))
+        self.target.itemconfigure(self.image_item, image=self.photo)
+
+    def present(self):
+        """合成当前显示列表并贴到画布上；后台合成时显示的是上一次提交的帧"""
+        display_list = [
+            (kind, tuple(coords), dict(options))
+            for kind, coords, options, _ in self.items.values()
+            if options.get('state') != 'hidden'
+        ]
+        if self.executor is None:
+            self._show(self.compose(display_list))
+            return
+        if self.pending is not None:
+            self._show(self.pending.result())
+        self.pending = self.executor.submit(self.compose, display_list)
+
+    def _show(self, frame):
+        self.photo.paste(frame)
+        self.target.update_idletasks()
+
+    def compose(self, display_list):
+        """把显示列表画到一张新的帧缓冲上"""
+        frame = Image.new('RGBA', (self.width, self.height), self.background)
+        draw = ImageDraw.Draw(frame, 'RGBA')
+        for kind, coords, options in display_list:
+            if kind == 'image':
+                self._draw_image(frame, coords, options)
+            elif kind == 'text':
+                self._draw_text(draw, coords, options)
+            elif kind == 'line':
+                self._draw_line(draw, coords, options)
+            else:
+                self._draw_shape(frame, draw, kind, coords, options)
+        return frame
+
+    @staticmethod
+    def _color(color, stipple=None):
+        if not color:
+            return None
+        rgb = ImageColor.getrgb(color)[:3]
+        # stipple='gray50' 近似为 50% 透明
+        return rgb + ((128,) if stipple else (255,))
+
+    def _draw_shape(self, frame, draw, kind, coords, options):
+        x0, y0, x1, y1 = coords
+        box = [min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)]
+        if box[2] - box[0] < 1 or box[3] - box[1] < 1:
+            return
+        fill = self._color(options.get('fill'), options.get('stipple'))
+        # 与 tk 默认一致：椭圆和矩形默认有 1 像素黑色轮廓
+        outline = self._color(options.get('outline', 'black'))
+        width = int(options.get('width', 1))
+        dash = options.get('dash')
+        shape = draw.ellipse if kind == 'oval' else draw.rectangle
+        if dash and outline:
+            # 虚线要分段画，按尺寸和样式缓存成图片，之后只需贴图
+            size = (round(box[2] - box[0]), round(box[3] - box[1]))
+            key = (kind, size, fill, outline, width, tuple(dash))
+            sprite = self.dashed_shapes.get(key)
+            if sprite is None:
+                if len(self.dashed_shapes) >= _DASHED_CACHE_SIZE:
+                    self.dashed_shapes.clear()
+                sprite = self.dashed_shapes[key] = self._render_dashed(kind, size, fill, outline, width, dash)
+            self._blit(frame, sprite, round(box[0]) - width, round(box[1]) - width)
+        else:
+            shape(box, fill=fill, outline=outline, width=width if outline else 0)
+
+    def _render_dashed(self, kind, size, fill, outline, width, dash):
+        image = Image.new('RGBA', (size[0] + width * 2 + 1, size[1] + width * 2 + 1), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(image)
+        x0, y0 = width, width
+        x1, y1 = x0 + size[0], y0 + size[1]
+        if kind == 'oval':
+            if fill:
+                draw.ellipse([x0, y0, x1, y1], fill=fill)
+            self._dashed_ellipse(draw, [x0, y0, x1, y1], outline, width, dash)
+        else:
+            if fill:
+                draw.rectangle([x0, y0, x1, y1], fill=fill)
+            self._dashed_polyline(draw, [x0, y0, x1, y0, x1, y1, x0, y1, x0, y0], outline, width, dash)
+        return image
+
+    def _draw_line(self, draw, coords, options):
+        fill = self._color(options.get('fill', 'black'))
+        width = int(options.get('width', 1))
+        dash = options.get('dash')
+        if len(coords) < 4 or fill is None:
+            return
+        if dash:
+            self._dashed_polyline(draw, coords, fill, width, dash)
+        else:
+            # smooth=True 的曲线点已经足够密，直接连成折线
+            draw.line(list(coords), fill=fill, width=width, joint='curve')
+
+    @staticmethod
+    def _dashed_polyline(draw, coords, fill, width, dash):
+        """按 dash 的 (实线长, 空白长, ...) 像素长度沿折线画虚线"""
+        pattern = list(dash)
+        index, remaining, drawing = 0, pattern[0], True
+        points = list(zip(coords[0::2], coords[1::2]))
+        for (ax, ay), (bx, by) in zip(points, points[1:]):
+            length = math.hypot(bx - ax, by - ay)
+            position = 0.0
+            while position < length:
+                step = min(remaining, length - position)
+                if drawing:
+                    t0, t1 = position / length, (position + step) / length
+                    draw.line([ax + (bx - ax) * t0, ay + (by - ay) * t0,
+                               ax + (bx - ax) * t1, ay + (by - ay) * t1], fill=fill, width=width)
+                position += step
+                remaining -= step
+                if remaining <= 0:
+                    index = (index + 1) % len(pattern)
+                    remaining, drawing = pattern[index], not drawing
+
+    @staticmethod
+    def _dashed_ellipse(draw, box, outline, width, dash):
+        """沿椭圆周长按 dash 像素长度画一段段圆弧"""
+        rx = (box[2] - box[0]) / 2
+        ry = (box[3] - box[1]) / 2
+        # Ramanujan 近似周长，换算成每像素对应的角度
+        perimeter = math.pi * (3 * (rx + ry) - math.sqrt((3 * rx + ry) * (rx + 3 * ry)))
+        degrees_per_pixel = 360 / max(perimeter, 1)
+        angle, index = 0.0, 0
+        while angle < 360:
+            span = dash[index % len(dash)] * degrees_per_pixel
+            if index % 2 == 0:
+                draw.arc(box, angle, min(angle + span, 360), fill=outline, width=width)
+            angle += span
+            index += 1
+
+    def _font(self, font):
+        if isinstance(font, str):
+            font = (font, 12)
+        size = abs(int(font[1])) if len(font) > 1 else 12
+        cached = self.fonts.get(size)
+        if cached is None:
+            cached = self.fonts[size] = self._load_font(size)
+        return cached
+
+    def _load_font(self, size):
+        for font_file in ((self.font_file,) if self.font_file else ()) + _FALLBACK_FONTS:
+            try:
+                return ImageFont.truetype(font_file, size)
+            except OSError:
+                pass
+        try:
+            return ImageFont.load_default(size)
+        except TypeError:
+            # 旧版 Pillow 的 load_default 不接受字号
+            return ImageFont.load_default()
+
+    def _draw_text(self, draw, coords, options):
+        text = str(options.get('text', ''))
+        if not text:
+            return
+        fill = self._color(options.get('fill', 'black'))
+        font = self._font(options.get('font', ('TkDefaultFont', 12)))
+        anchor = _TEXT_ANCHORS[options.get('anchor', 'center')]
+        x, y = coords[:2]
+        if '\n' in text:
+            # 多行文字的垂直锚点只能是顶部
+            draw.multiline_text((x, y), text, fill=fill, font=font, anchor=anchor[0] + 'a',
+                                align=options.get('justify', 'left'))
+        else:
+            draw.text((x, y), text, fill=fill, font=font, anchor=anchor)
+
+    def _draw_image(self, frame, coords, options):
+        photo = options.get('image')
+        if photo is None:
+            return
+        image = photo.image
+        x, y = coords[:2]
+        if options.get('anchor', 'center') == 'center':
+            x -= image.width / 2
+            y -= image.height / 2
+        self._blit(frame, image, round(x), round(y))
+
+    def _blit(self, frame, image, x, y):
+        if image.mode != 'RGBA':
+            frame.paste(image, (x, y))
+            return
+        # alpha_composite 不接受负的目标坐标，先裁掉画布外的部分
+        left, top = max(-x, 0), max(-y, 0)
+        right = min(image.width, self.width - x)
+        bottom = min(image.height, self.height - y)
+        if left < right and top < bottom:
+            frame.alpha_composite(image, (x + left, y + top), (left, top, right, bottom))
@@ -0,0 +1,82 @@
+"""检测器动画用的预计算表
+
+动画里的相位都是 animation_frame * k + 常数 的形式，每帧重复调用 math.sin/math.cos
+并格式化颜色字符串。这里在启动时把一个周期的正弦、余弦按 PHASE_STEPS 等分预先算好，
+相位换算成整数下标后只需查表；颜色字符串也按相位或亮度预先生成，每帧不再格式化。
+
+    python detector_tables.py    # 对比查表和直接计算的每帧耗时
+"""
+import math
+import sys
+import timeit
+
+# 一个周期分成的份数，必须是2的幂，下标用 & MASK 取模（负数也适用）
+PHASE_STEPS = 4096
+MASK = PHASE_STEPS - 1
+_SCALE = PHASE_STEPS / (2 * math.pi)
+
+SIN = [math.sin(i / _SCALE) for i in range(PHASE_STEPS)]
+COS = [math.cos(i / _SCALE) for i in range(PHASE_STEPS)]
+
+def index(phase):
+    """相位（弧度）换算为表下标，未取模，可以直接与其他下标相加"""
+    return round(phase * _SCALE)
+
+def phase_table(function):
+    """按相位预先计算 function(相位)，返回长度为 PHASE_STEPS 的表"""
+    return [function(i / _SCALE) for i in range(PHASE_STEPS)]
+
+_colors = {}
+
+def rgb(r, g, b):
+    """返回 #rrggbb 颜色字符串，相同颜色总是返回同一个字符串对象"""
+    key = (r << 16) | (g << 8) | b
+    color = _colors.get(key)
+    if color is None:
+        color = _colors[key] = sys.intern(f'#{key:06x}')
+    return color
+
+# 像素能量场景按相位预先生成的格子颜色，检测器和下面的微基准共用
+ENERGY_COLORS = phase_table(lambda phase: rgb(int(abs(math.sin(phase)) * 127 + 128), 255, 0))
+
+def _energy_frame_math(cells, frame):
+    colors = []
+    for row, col in cells:
+        energy = math.sin(row * 0.1 + col * 0.1 + frame * 0.1)
+        colors.append(f'#{int(abs(energy) * 127 + 128):02x}ff00')
+    return colors
+
+def _energy_frame_table(cell_phases, frame):
+    base = index(frame * 0.1)
+    return [ENERGY_COLORS[(phase + base) & MASK] for phase in cell_phases]
+
+def _orbit_frame_math(frame, count=16):
+    points = []
+    for i in range(count):
+        angle = frame * 0.1 + i * (2 * math.pi / count)
+        points.append((math.cos(angle), math.sin(angle)))
+    return points
+
+def _orbit_frame_table(frame, offsets):
+    base = index(frame * 0.1)
+    return [(COS[(base + offset) & MASK], SIN[(base + offset) & MASK]) for offset in offsets]
+
+def main():
+    """微基准：像素能量场景一帧的颜色计算、粒子环一帧的坐标计算"""
+    cells = [(row, col) for row in range(0, 400, 30) for col in range(0, 700, 30)]
+    cell_phases = [index(row * 0.1 + col * 0.1) for row, col in cells]
+    offsets = [index(i * (2 * math.pi / 16)) for i in range(16)]
+    cases = (
+        (f"像素能量颜色（{len(cells)} 格）",
+         lambda: _energy_frame_math(cells, 123), lambda: _energy_frame_table(cell_phases, 123)),
+        ("粒子环坐标（16 个）",
+         lambda: _orbit_frame_math(123), lambda: _orbit_frame_table(123, offsets)),
+    )
+    print(f"{'':<22}{'直接计算 µs/帧':>16}{'查表 µs/帧':>14}{'加速比':>8}")
+    for name, direct, table in cases:
+        direct_time = min(timeit.repeat(direct, number=1000, repeat=5)) * 1000
+        table_time = min(timeit.repeat(table, number=1000, repeat=5)) * 1000
+        print(f"{name:<22}{direct_time:>16.1f}{table_time:>14.1f}{direct_time / table_time:>8.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,5 @@
+import argparse
+import sys
 import tkinter as tk
 from tkinter import ttk, font
 from PIL import Image, ImageTk
@@ -6,16 +8,287 @@ import random
 import time
 import os
 import ctypes
+import cProfile
+import csv
+import json
+from array import array
+from collections import deque
+
+from detector_compositor import Compositor
+from detector_sprites import SpriteAtlas
+from detector_tables import ENERGY_COLORS, SIN, COS, MASK, index, phase_table, rgb
+
+try:
+    import numpy as np
+except ImportError:  # 没有 NumPy 时像素能量场景退回逐格矩形绘制
+    np = None
+
+# 场景按 700×400 的设计坐标编写，运行时按画布实际大小缩放
+DESIGN_WIDTH = 700
+DESIGN_HEIGHT = 400
+
+# 像素能量场景的格子边长（设计坐标）；使用 NumPy 时整幅图一次贴图，可以设得很小（如 4）
+ENERGY_CELL_SIZE = 30
+
+# 按相位预先生成的薛定谔粒子颜色（在红绿之间分 32 档渐变，每档一组精灵）；
+# 像素能量格子的颜色 ENERGY_COLORS 在 detector_tables 中，与微基准共用
+PARADOX_COLOR_STEPS = 32
+def _paradox_color(phase):
+    mix = round(abs(math.sin(phase)) * (PARADOX_COLOR_STEPS - 1)) / (PARADOX_COLOR_STEPS - 1)
+    return rgb(int(255 * (1 - mix)), int(255 * mix), 255)
+PARADOX_COLORS = phase_table(_paradox_color)
+
+# 光子场景：粒子数上限、每帧生成的粒子数（默认值，可用 --photons、--photon-spawn
+# 或环境变量 DETECTOR_PHOTONS、DETECTOR_PHOTON_SPAWN 修改）
+PHOTON_MAX = 100
+PHOTON_SPAWN_PER_FRAME = 1
+# 粒子数超过这个值且有 NumPy 时，光子画到一张图片上，而不是每个粒子一个画布元素
+PHOTON_ITEM_LIMIT = 300
+# 在光子场景左上角显示粒子数和每帧耗时，用于按显示器性能选择粒子数
+# （--photon-stats 或 DETECTOR_PHOTON_STATS=1 打开）
+PHOTON_SHOW_FRAME_TIME = False
+
+# 动画目标帧率；绘制耗时超过帧周期的 FRAME_BUDGET 倍时自动降低画面细节
+TARGET_FPS = 20
+FRAME_BUDGET = 0.8
+# 画面细节等级（粒子数、轨迹长度、像素格子密度的比例），以及两次调整之间至少间隔的帧数
+QUALITY_LEVELS = (1.0, 0.75, 0.5, 0.25)
+QUALITY_COOLDOWN_FRAMES = 40
+
+class PhotonField:
+    """光子粒子系统
+    
+    坐标、速度、大小和亮度分别存放在数组里（有 NumPy 时用 ndarray，否则用 array('d')），
+    每帧整批移动并在边界反弹。有 NumPy 时新粒子也整批生成，随机数生成器的种子取自 random 模块，
+    random.seed 之后生成的粒子仍是确定的（但与没有 NumPy 时不同）。
+    """
+    def __init__(self, capacity, width=700, height=400):
+        self.capacity = capacity
+        self.width = width
+        self.height = height
+        self.count = 0
+        if np is not None:
+            self.rng = np.random.default_rng(random.getrandbits(64))
+            def column():
+                return np.zeros(capacity)
+        else:
+            def column():
+                return array('d', bytes(8 * capacity))
+        self.x = column()
+        self.y = column()
+        self.dx = column()
+        self.dy = column()
+        self.size = column()
+        self.intensity = column()
+        
+    def spawn(self, n):
+        """生成最多 n 个粒子，返回新粒子的下标范围"""
+        start = self.count
+        stop = min(start + n, self.capacity)
+        if np is not None and stop > start:
+            rng = self.rng
+            count = stop - start
+            self.x[start:stop] = rng.integers(0, self.width, count, endpoint=True)
+            self.y[start:stop] = rng.integers(0, self.height, count, endpoint=True)
+            self.dx[start:stop] = rng.uniform(-3, 3, count)
+            self.dy[start:stop] = rng.uniform(-3, 3, count)
+            self.size[start:stop] = rng.uniform(2, 4, count)
+            self.intensity[start:stop] = rng.random(count)
+            self.count = stop
+            return range(start, stop)
+        for i in range(start, stop):
+            self.x[i] = random.randint(0, self.width)
+            self.y[i] = random.randint(0, self.height)
+            self.dx[i] = random.uniform(-3, 3)
+            self.dy[i] = random.uniform(-3, 3)
+            self.size[i] = random.uniform(2, 4)
+            self.intensity[i] = random.random()
+        self.count = stop
+        return range(start, stop)
+        
+    def truncate(self, n):
+        """只保留前 n 个粒子"""
+        self.count = min(self.count, n)
+        
+    def step(self):
+        """所有粒子移动一步，越过边界的粒子速度反向"""
+        n = self.count
+        if np is not None:
+            x, y, dx, dy = self.x[:n], self.y[:n], self.dx[:n], self.dy[:n]
+            x += dx
+            y += dy
+            dx[(x < 0) | (x > self.width)] *= -1
+            dy[(y < 0) | (y > self.height)] *= -1
+            return
+        x, y, dx, dy = self.x, self.y, self.dx, self.dy
+        width, height = self.width, self.height
+        for i in range(n):
+            x[i] += dx[i]
+            y[i] += dy[i]
+            if x[i] < 0 or x[i] > width:
+                dx[i] = -dx[i]
+            if y[i] < 0 or y[i] > height:
+                dy[i] = -dy[i]
+
+# 性能统计（F3 切换显示，F4 导出记录）：
+#   DETECTOR_HUD=1              启动时即显示帧率、帧耗时和画布元素数
+#   DETECTOR_TRACE=trace.csv    每帧耗时记录的导出路径（.json 或 .csv），退出时自动导出
+#   DETECTOR_PROFILE=2:100      用 cProfile 分析场景 2 的 100 帧，结果写入 detector_scene2.prof
+TRACE_MAX_FRAMES = 20000
+
+class _TimedCanvas:
+    """包装画布，累计画布方法调用的耗时，用于区分计算和画布元素更新"""
+    def __init__(self, canvas):
+        self._canvas = canvas
+        self.elapsed = 0.0
+        
+    def __getattr__(self, name):
+        method = getattr(self._canvas, name)
+        if not callable(method):
+            return method
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.elapsed += time.perf_counter() - started
+        return timed
+
+class FrameStats:
+    """动画性能统计
+    
+    每帧记录当前场景的计算、画布元素更新和 Tk 刷新耗时，在画布右上角显示
+    帧率、p50/p99 帧耗时和元素数，并可导出记录或对指定场景运行 cProfile。
+    """
+    def __init__(self, canvas, window=120):
+        self.canvas = canvas
+        self.timed_canvas = _TimedCanvas(canvas)
+        self.enabled = os.environ.get('DETECTOR_HUD') == '1'
+        self.trace_path = os.environ.get('DETECTOR_TRACE')
+        self.trace = deque(maxlen=TRACE_MAX_FRAMES)
+        self.window = window
+        self.scene_times = {}
+        self.presented = deque(maxlen=window)
+        self.hud = None
+        
+        self.profile_scene = None
+        self.profile_frames = 0
+        self.profiler = None
+        profile = os.environ.get('DETECTOR_PROFILE')
+        if profile:
+            scene, _, frames = profile.partition(':')
+            self.profile_scene = int(scene)
+            self.profile_frames = int(frames or 100)
+            self.profiler = cProfile.Profile()
+            
+    def wants(self, scene):
+        """这一帧是否需要计时"""
+        return self.enabled or (scene == self.profile_scene and self.profile_frames > 0)
+        
+    def toggle(self):
+        self.enabled = not self.enabled
+        if self.hud is not None:
+            self.canvas.itemconfigure(self.hud, state='normal' if self.enabled else 'hidden')
+            
+    def measure(self, app, frame, scene, draw):
+        """绘制一帧并记录各部分耗时；绘制期间 app.canvas 换成计时包装"""
+        timed = self.timed_canvas
+        timed.elapsed = 0.0
+        profiling = scene == self.profile_scene and self.profile_frames > 0
+        app.canvas = timed
+        started = time.perf_counter()
+        try:
+            if profiling:
+                self.profiler.runcall(draw)
+            else:
+                draw()
+        finally:
+            app.canvas = self.canvas
+        drawn = time.perf_counter()
+        # 立即完成待处理的重绘，得到 Tk 刷新的耗时
+        self.canvas.update_idletasks()
+        flushed = time.perf_counter()
+        
+        if profiling:
+            self.profile_frames -= 1
+            if self.profile_frames == 0:
+                self.profiler.dump_stats(f'detector_scene{scene}.prof')
+                
+        record = {
+            'frame': frame,
+            'scene': scene,
+            'quality': app.quality,
+            'compute_ms': (drawn - started - timed.elapsed) * 1000,
+            'items_ms': timed.elapsed * 1000,
+            'flush_ms': (flushed - drawn) * 1000,
+            'total_ms': (flushed - started) * 1000,
+            'items': len(self.canvas.find_all()),
+        }
+        self.trace.append(record)
+        self.scene_times.setdefault(scene, deque(maxlen=self.window)).append(record['total_ms'])
+        self.presented.append(flushed)
+        if self.enabled:
+            self.update_hud(record)
+            
+    def update_hud(self, record):
+        times = sorted(self.scene_times[record['scene']])
+        p50 = times[len(times) // 2]
+        p99 = times[min(len(times) - 1, int(len(times) * 0.99))]
+        fps = 0.0
+        if len(self.presented) > 1:
+            fps = (len(self.presented) - 1) / (self.presented[-1] - self.presented[0])
+        text = (
+            f"场景 {record['scene']}  {fps:.1f} FPS\n"
+            f"帧耗时 p50 {p50:.1f} ms  p99 {p99:.1f} ms\n"
+            f"计算 {record['compute_ms']:.1f}  元素 {record['items_ms']:.1f}  刷新 {record['flush_ms']:.1f} ms\n"
+            f"元素数 {record['items']}  细节 {record['quality']:.0%}"
+        )
+        if self.hud is None:
+            self.hud = self.canvas.create_text(
+                0, 10,
+                anchor='ne',
+                justify='right',
+                fill='#FFC107',
+                font=('Consolas', 10),
+                tags='hud'
+            )
+        self.canvas.itemconfigure(self.hud, text=text)
+        self.canvas.coords(self.hud, self.canvas.winfo_width() - 10, 10)
+        self.canvas.tag_raise(self.hud)
+        
+    def dump_trace(self, path=None):
+        """导出每帧记录，扩展名为 .json 时写 JSON，否则写 CSV"""
+        path = path or self.trace_path or 'detector_trace.csv'
+        records = list(self.trace)
+        if path.endswith('.json'):
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(records, f, ensure_ascii=False, indent=2)
+        else:
+            with open(path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=[
+                    'frame', 'scene', 'quality', 'compute_ms', 'items_ms', 'flush_ms', 'total_ms', 'items'
+                ])
+                writer.writeheader()
+                writer.writerows(records)
+        return path
 
 class ScreenDetector9000:
-    def __init__(self):
+    def __init__(self, benchmark=False, backend='canvas', photons=PHOTON_MAX,
+                 photon_spawn=PHOTON_SPAWN_PER_FRAME, photon_stats=PHOTON_SHOW_FRAME_TIME):
+        self.photon_max = max(photons, 1)
+        self.photon_spawn = max(photon_spawn, 1)
+        self.photon_stats_enabled = photon_stats
         self.root = tk.Tk()
         self.root.title("屏幕状态超级量子计算机人工智能检测器 - by: 南风梦西洲")
         
-        # 设置全屏
-        self.root.attributes('-fullscreen', True)
+        # 设置全屏（基准测试时使用普通窗口，由 run_benchmark 逐帧驱动）
+        if not benchmark:
+            self.root.attributes('-fullscreen', True)
         # 添加 Esc 键退出全屏的功能
         self.root.bind('<Escape>', lambda e: self.root.attributes('-fullscreen', False))
+        # F3 显示/隐藏性能统计，F4 导出每帧耗时记录
+        self.root.bind('<F3>', lambda e: self.stats.toggle())
+        self.root.bind('<F4>', lambda e: self.stats.dump_trace())
         
         self.root.configure(bg='#1a1a2e')
         
@@ -91,7 +364,26 @@ class ScreenDetector9000:
             bg='#1a1a2e',
             highlightthickness=0
         )
-        self.canvas.pack(pady=20)
+        self.canvas.pack(pady=20, expand=True, fill='both')
+        # 画布大小变化时重新计算布局
+        self.update_layout(DESIGN_WIDTH, DESIGN_HEIGHT)
+        self.canvas.bind('<Configure>', self.on_canvas_resize)
+        
+        # 离屏合成后端：场景画到帧缓冲上，每帧一次贴到画布上唯一的图片里
+        self.backend = backend
+        if backend == 'canvas':
+            self.new_photo = ImageTk.PhotoImage
+        else:
+            self.canvas = Compositor(
+                self.canvas, DESIGN_WIDTH, DESIGN_HEIGHT,
+                font_file=font_path if os.path.exists(font_path) else None,
+                threaded=backend == 'compositor-thread'
+            )
+            self.new_photo = self.canvas.new_photo
+            
+        self.stats = FrameStats(self.canvas)
+        # 粒子、轨迹和光晕的预渲染图片
+        self.sprites = SpriteAtlas(photo_factory=self.new_photo)
         
         # 进度条
         style = ttk.Style()
@@ -113,9 +405,27 @@ class ScreenDetector9000:
         
         # 动画状态
         self.current_step = 0
-        self.particles = []
         self.animation_frame = 0
         
+        # 场景：(创建画布元素, 更新一帧)，下标与 current_step 对应。
+        # 每个场景的元素只在首次进入时创建，之后每帧只更新坐标和样式，切换时隐藏
+        self.scenes = [
+            (self.build_electron_flow, self.draw_electron_flow),
+            (self.build_pixel_energy, self.draw_pixel_energy),
+            (self.build_photon_activity, self.draw_photon_activity),
+            (self.build_quantum_state, self.draw_quantum_state),
+            (self.build_schrodinger_paradox, self.draw_schrodinger_paradox),  # 薛定谔的显示器悖论检验
+            (self.build_final_result, self.draw_final_result),  # 最终结论
+        ]
+        self.built_scenes = set()
+        self.active_scene = None
+        
+        # 调度：检测步骤和动画帧都按 perf_counter 上的截止时间推进，不随绘制耗时漂移
+        self.frame_period = 1 / TARGET_FPS
+        self.frame_time = 0.0  # 每帧绘制耗时的平均值（秒）
+        self.quality_level = 0
+        self.quality_cooldown = 0
+        
         # 检测步骤
         self.steps = [
             ("正在扫描显示器电子流动状态...", 3000),
@@ -127,11 +437,31 @@ class ScreenDetector9000:
         ]
         
         # 开始检测过程
-        self.start_detection()
+        if not benchmark:
+            self.start_detection()
         
     def start_detection(self):
-        self.next_step()
-        self.update_animation()
+        now = time.perf_counter()
+        self.next_step_at = now
+        self.next_frame_at = now
+        self.tick()
+        
+    def tick(self):
+        """调度器：到期的检测步骤和动画帧按同一个时钟推进，然后等到下一个截止时间"""
+        now = time.perf_counter()
+        while self.current_step < len(self.steps) and now >= self.next_step_at:
+            self.next_step()
+        if now >= self.next_frame_at:
+            # 落后超过一帧时只绘制一次，动画进度按错过的帧数推进
+            frames = int((now - self.next_frame_at) / self.frame_period) + 1
+            self.next_frame_at += frames * self.frame_period
+            self.update_animation(frames)
+            
+        deadline = self.next_frame_at
+        if self.current_step < len(self.steps):
+            deadline = min(deadline, self.next_step_at)
+        delay = math.ceil((deadline - time.perf_counter()) * 1000)
+        self.root.after(max(delay, 0), self.tick)
         
     def next_step(self):
         if self.current_step < len(self.steps):
@@ -142,127 +472,315 @@ class ScreenDetector9000:
             else:
                 self.status_label.config(text=step_text, font=self.text_font)
             self.progress['value'] = (self.current_step + 1) * (100 / len(self.steps))
-            self.root.after(duration, self.next_step)
+            self.next_step_at += duration / 1000
             self.current_step += 1
             
-    def update_animation(self):
-        self.canvas.delete('all')
-        self.animation_frame += 1
-        
-        if self.current_step == 0:
-            self.draw_electron_flow()
-        elif self.current_step == 1:
-            self.draw_pixel_energy()
-        elif self.current_step == 2:
-            self.draw_photon_activity()
-        elif self.current_step == 3:
-            self.draw_quantum_state()
-        elif self.current_step == 4:  # 薛定谔的显示器悖论检验
-            self.draw_schrodinger_paradox()
-        elif self.current_step == 5:  # 最终结论
-            self.draw_final_result()
+    def update_animation(self, frames=1):
+        self.animation_frame += frames
+        
+        scene = self.current_step if self.current_step < len(self.scenes) else None
+        self.show_scene(scene)
+        
+        if scene is not None:
+            _, draw = self.scenes[scene]
+            started = time.perf_counter()
+            if self.stats.wants(scene):
+                self.stats.measure(self, self.animation_frame, scene, draw)
+            else:
+                draw()
+                # 画布后端的 draw() 只是排队绘图命令，Tk 在空闲时才重绘；
+                # 先完成重绘再计时，画质调节才能把重绘（通常是主要开销）算进去
+                self.canvas.update_idletasks()
+            self.adapt_quality(time.perf_counter() - started)
+            
+    def show_scene(self, scene):
+        """切换场景时隐藏旧场景的画布元素，首次进入的场景创建一次元素"""
+        if scene != self.active_scene:
+            if self.active_scene is not None:
+                self.canvas.itemconfigure(f'scene{self.active_scene}', state='hidden')
+            if scene is not None:
+                build, _ = self.scenes[scene]
+                if scene in self.built_scenes:
+                    # 带 standby 标签的元素（如尚未生成的光子）保持隐藏
+                    self.canvas.itemconfigure(f'scene{scene}&&!standby', state='normal')
+                else:
+                    build(f'scene{scene}')
+                    self.built_scenes.add(scene)
+            self.active_scene = scene
             
-        self.root.after(50, self.update_animation)
+    def update_layout(self, width, height):
+        """按画布实际大小计算布局：铺满画布的场景用整个宽高，其余场景居中并等比缩放"""
+        self.view_width = width
+        self.view_height = height
+        self.scale = min(width / DESIGN_WIDTH, height / DESIGN_HEIGHT)
+        self.center_x = width / 2
+        self.center_y = height / 2
         
-    def draw_electron_flow(self):
-        # 电子流动效果
+    def on_canvas_resize(self, event):
+        if (event.width, event.height) == (self.view_width, self.view_height):
+            return
+        self.update_layout(event.width, event.height)
+        if self.backend != 'canvas':
+            self.canvas.resize(event.width, event.height)
+        self.sprites.set_scale(self.scale)
+        # 已创建的场景按新布局重新创建，当前场景在下一帧重建
+        for scene in self.built_scenes:
+            self.canvas.delete(f'scene{scene}')
+        self.built_scenes.clear()
+        self.active_scene = None
+        
+    @property
+    def quality(self):
+        return QUALITY_LEVELS[self.quality_level]
+        
+    def adapt_quality(self, elapsed):
+        """绘制耗时超出帧预算时降低一级画面细节，持续有富余时再逐级恢复"""
+        self.frame_time += (elapsed - self.frame_time) * 0.2
+        if self.quality_cooldown > 0:
+            self.quality_cooldown -= 1
+            return
+        budget = self.frame_period * FRAME_BUDGET
+        if self.frame_time > budget and self.quality_level < len(QUALITY_LEVELS) - 1:
+            self.quality_level += 1
+        elif self.frame_time < budget / 3 and self.quality_level > 0:
+            self.quality_level -= 1
+        else:
+            return
+        self.quality_cooldown = QUALITY_COOLDOWN_FRAMES
+        
+    def set_standby(self, item, standby):
+        """隐藏或显示场景中的元素；隐藏的元素带 standby 标签，切换回场景时保持隐藏"""
+        if standby:
+            self.canvas.addtag_withtag('standby', item)
+            self.canvas.itemconfigure(item, state='hidden')
+        else:
+            self.canvas.dtag(item, 'standby')
+            self.canvas.itemconfigure(item, state='normal')
+        
+    def build_electron_flow(self, tag):
+        width = max(1, round(2 * self.scale))
+        self.electrons = []
         for i in range(10):
-            x = (self.animation_frame * 5 + i * 70) % 700
-            y = 200 + math.sin(x * 0.05) * 50
-            
             # 电子
-            self.canvas.create_oval(
-                x-10, y-10, x+10, y+10,
+            electron = self.canvas.create_oval(
+                0, 0, 0, 0,
                 fill='#4CAF50',
                 outline='#2196F3',
-                width=2
+                width=width,
+                tags=tag
             )
             # 轨迹
-            self.canvas.create_line(
-                x-20, y, x+20, y,
+            trail = self.canvas.create_line(
+                0, 0, 0, 0,
                 fill='#2196F3',
                 width=1,
-                dash=(3,2)
+                dash=(3,2),
+                tags=tag
             )
+            self.electrons.append((electron, trail))
         
-    def draw_pixel_energy(self):
-        cell_size = 30
-        for row in range(0, 400, cell_size):
-            for col in range(0, 700, cell_size):
-                energy = math.sin(row * 0.1 + col * 0.1 + self.animation_frame * 0.1)
-                color = f'#{int(abs(energy) * 127 + 128):02x}ff00'
-                
-                self.canvas.create_rectangle(
+    def draw_electron_flow(self):
+        # 电子流动效果：在设计坐标中计算，横向铺满整个画布
+        scale = self.scale
+        span = self.view_width / scale
+        middle = self.center_y / scale
+        for i, (electron, trail) in enumerate(self.electrons):
+            x = (self.animation_frame * 5 + i * span / 10) % span
+            y = middle + math.sin(x * 0.05) * 50
+            
+            x, y = x * scale, y * scale
+            self.canvas.coords(electron, x - 10 * scale, y - 10 * scale, x + 10 * scale, y + 10 * scale)
+            self.canvas.coords(trail, x - 20 * scale, y, x + 20 * scale, y)
+        
+    def _energy_cell_size(self):
+        """格子边长随画布缩放，格子数与分辨率无关；画面细节降低时格子相应变大"""
+        return max(4, int(ENERGY_CELL_SIZE * self.scale / self.quality))
+        
+    def build_pixel_energy(self, tag):
+        cell_size = self._energy_cell_size()
+        self.energy_tag = tag
+        self.energy_cell_size = cell_size
+        if np is not None:
+            self._build_pixel_energy_image(tag, cell_size)
+            return
+        # 相位按设计坐标计算，放大后图案不变
+        phase_scale = 0.1 / self.scale
+        self.energy_cells = []
+        for row in range(0, self.view_height, cell_size):
+            for col in range(0, self.view_width, cell_size):
+                cell = self.canvas.create_rectangle(
                     col, row,
                     col + cell_size - 2,
                     row + cell_size - 2,
-                    fill=color,
-                    outline=''
+                    fill='#80ff00',
+                    outline='',
+                    tags=tag
                 )
+                self.energy_cells.append((cell, index((row + col) * phase_scale)))
+        
+    def _build_pixel_energy_image(self, tag, cell_size):
+        """NumPy版本：整幅能量场计算为数组，渲染到一张复用的图片上"""
+        width, height = self.view_width, self.view_height
+        rows = np.arange(0, height, cell_size)
+        cols = np.arange(0, width, cell_size)
+        # 每个格子的固定相位（按设计坐标），每帧只需加上时间相位
+        phase_scale = 0.1 / self.scale
+        self.energy_phase = rows[:, None] * phase_scale + cols[None, :] * phase_scale
+        
+        # 颜色查找表：红色分量 0-255，绿色固定为 255
+        self.energy_lut = np.zeros((256, 3), dtype=np.uint8)
+        self.energy_lut[:, 0] = np.arange(256)
+        self.energy_lut[:, 1] = 255
+        
+        # 每帧的格子颜色，多出的最后一行、一列固定为背景色，用于格子之间 2 像素的间隙
+        self.energy_rgb = np.empty((len(rows) + 1, len(cols) + 1, 3), dtype=np.uint8)
+        self.energy_rgb[:] = (0x1a, 0x1a, 0x2e)
+        
+        # 每个像素取色的格子下标，间隙像素指向背景行/列，这样每帧只需一次查表
+        y = np.arange(height)
+        x = np.arange(width)
+        self.energy_row_index = np.where(y % cell_size >= cell_size - 2, len(rows), y // cell_size)[:, None]
+        self.energy_col_index = np.where(x % cell_size >= cell_size - 2, len(cols), x // cell_size)[None, :]
+        
+        self.energy_photo = self.new_photo(Image.new('RGB', (width, height), '#1a1a2e'))
+        self.canvas.create_image(0, 0, image=self.energy_photo, anchor='nw', tags=tag)
+        
+    def draw_pixel_energy(self):
+        if self.energy_cell_size != self._energy_cell_size():
+            self.canvas.delete(self.energy_tag)
+            self.build_pixel_energy(self.energy_tag)
+        if np is not None:
+            energy = np.sin(self.energy_phase + self.animation_frame * 0.1)
+            levels = (np.abs(energy) * 127 + 128).astype(np.uint8)
+            self.energy_rgb[:-1, :-1] = self.energy_lut[levels]
+            frame = self.energy_rgb[self.energy_row_index, self.energy_col_index]
+            self.energy_photo.paste(Image.fromarray(frame))
+            return
+        # 格子的固定相位加上时间相位，直接查出颜色
+        base = index(self.animation_frame * 0.1)
+        for cell, phase in self.energy_cells:
+            self.canvas.itemconfigure(cell, fill=ENERGY_COLORS[(phase + base) & MASK])
+        
+    def build_photon_activity(self, tag):
+        # 粒子在设计坐标中运动，画布越大粒子越大，粒子数不随分辨率增加
+        self.photons = PhotonField(self.photon_max, round(self.view_width / self.scale), round(self.view_height / self.scale))
+        self.photon_frame_ms = 0.0
+        self.photon_use_image = np is not None and self.photon_max > PHOTON_ITEM_LIMIT
+        if self.photon_use_image:
+            # 每帧把全部光子画进同一个像素缓冲区，再贴到一张复用的图片上
+            self.photon_background = np.array((0x1a, 0x1a, 0x2e), dtype=np.uint8)
+            self.photon_pixels = np.empty((self.view_height, self.view_width, 3), dtype=np.uint8)
+            self.photon_photo = self.new_photo(Image.new('RGB', (self.view_width, self.view_height), '#1a1a2e'))
+            self.canvas.create_image(0, 0, image=self.photon_photo, anchor='nw', tags=tag)
+        else:
+            # 预先创建全部光子，生成之前保持隐藏
+            self.photon_items = [
+                self.canvas.create_oval(0, 0, 0, 0, outline='white', state='hidden', tags=(tag, 'standby'))
+                for _ in range(self.photon_max)
+            ]
+        if self.photon_stats_enabled:
+            self.photon_stats = self.canvas.create_text(
+                10, 10,
+                anchor='nw',
+                fill='#2196F3',
+                font=('Consolas', 10),
+                tags=tag
+            )
         
     def draw_photon_activity(self):
-        if len(self.particles) < 100:
-            self.particles.append({
-                'x': random.randint(0, 700),
-                'y': random.randint(0, 400),
-                'dx': random.uniform(-3, 3),
-                'dy': random.uniform(-3, 3),
-                'size': random.uniform(2, 4),
-                'intensity': random.random()
-            })
-            
-        for particle in self.particles:
-            x, y = particle['x'], particle['y']
-            size = particle['size']
-            intensity = particle['intensity']
-            
-            # 光子效果
-            color = f'#{int(intensity * 255):02x}ff{int(intensity * 255):02x}'
-            self.canvas.create_oval(
-                x, y, x + size, y + size,
-                fill=color,
-                outline='white'
+        started = time.perf_counter()
+        photons = self.photons
+        # 画面细节降低时减少粒子数，多出的粒子隐藏
+        limit = max(1, int(self.photon_max * self.quality))
+        if photons.count > limit and not self.photon_use_image:
+            for item in self.photon_items[limit:photons.count]:
+                self.set_standby(item, True)
+        photons.truncate(limit)
+        
+        spawned = photons.spawn(min(self.photon_spawn, limit - photons.count))
+        if not self.photon_use_image:
+            for i in spawned:
+                # 光子效果：颜色只在生成时设置一次
+                intensity = photons.intensity[i]
+                color = f'#{int(intensity * 255):02x}ff{int(intensity * 255):02x}'
+                item = self.photon_items[i]
+                self.set_standby(item, False)
+                self.canvas.itemconfigure(item, fill=color)
+                
+        if self.photon_use_image:
+            self._render_photon_image()
+        else:
+            scale = self.scale
+            for i in range(photons.count):
+                x, y, size = photons.x[i] * scale, photons.y[i] * scale, photons.size[i] * scale
+                self.canvas.coords(self.photon_items[i], x, y, x + size, y + size)
+        photons.step()
+        
+        # 每帧耗时取指数平均，避免数字跳动
+        elapsed = (time.perf_counter() - started) * 1000
+        self.photon_frame_ms += (elapsed - self.photon_frame_ms) * 0.1
+        if self.photon_stats_enabled:
+            self.canvas.itemconfigure(
+                self.photon_stats,
+                text=f'粒子 {photons.count}  每帧 {self.photon_frame_ms:.1f} ms'
             )
             
-            particle['x'] += particle['dx']
-            particle['y'] += particle['dy']
-            
-            if particle['x'] < 0 or particle['x'] > 700:
-                particle['dx'] *= -1
-            if particle['y'] < 0 or particle['y'] > 400:
-                particle['dy'] *= -1
-                
-    def draw_quantum_state(self):
+    def _render_photon_image(self):
+        """NumPy版本：光子画成边长 2-4 像素（按画布缩放）的方块，整批写入像素缓冲区"""
+        photons = self.photons
+        n = photons.count
+        scale = self.scale
+        height, width = self.photon_pixels.shape[:2]
+        pixels = self.photon_pixels
+        pixels[:] = self.photon_background
+        x = (photons.x[:n] * scale).astype(np.intp)
+        y = (photons.y[:n] * scale).astype(np.intp)
+        size = photons.size[:n] * scale
+        level = (photons.intensity[:n] * 255).astype(np.uint8)
+        color = np.empty((n, 3), dtype=np.uint8)
+        color[:, 0] = level
+        color[:, 1] = 255
+        color[:, 2] = level
+        side = math.ceil(4 * scale)
+        for oy in range(side):
+            for ox in range(side):
+                px = x + ox
+                py = y + oy
+                visible = (size > max(ox, oy)) & (px >= 0) & (px < width) & (py >= 0) & (py < height)
+                pixels[py[visible], px[visible]] = color[visible]
+        self.photon_photo.paste(Image.fromarray(pixels))
+        
+    def build_quantum_state(self, tag):
         # 量子态叠加效果
-        center_x = 350
-        center_y = 200
-        max_radius = 150
+        center_x = self.center_x
+        center_y = self.center_y
+        scale = self.scale
+        max_radius = 150 * scale
         
         # 在顶部显示概率文本
-        probability = abs(math.sin(self.animation_frame * 0.05))
-        self.canvas.create_text(
+        self.quantum_text = self.canvas.create_text(
             center_x,
-            30,  # 固定在顶部
-            text=f"粒子活跃度: {probability:.2%}",
+            center_y - 170 * scale,  # 固定在顶部
+            text='',
             font=self.text_font,
-            fill='#2196F3'
+            fill='#2196F3',
+            tags=tag
         )
         
+        self.quantum_dots = []
         for i in range(10):
-            radius = max_radius - i * 15
-            phase = self.animation_frame * 0.1 + i * 0.5
-            
-            x = center_x + math.cos(phase) * radius
-            y = center_y + math.sin(phase) * radius
+            radius = max_radius - i * 15 * scale
             
-            self.canvas.create_oval(
-                x-5, y-5, x+5, y+5,
+            dot = self.canvas.create_oval(
+                0, 0, 0, 0,
                 fill='#2196F3',
                 outline='#4CAF50',
-                width=2
+                width=2,
+                tags=tag
             )
+            self.quantum_dots.append((dot, radius, index(i * 0.5)))
             
-            # 量子轨道
+            # 量子轨道：位置固定，只需创建一次
             self.canvas.create_oval(
                 center_x - radius,
                 center_y - radius,
@@ -270,179 +788,311 @@ class ScreenDetector9000:
                 center_y + radius,
                 outline='#2196F3',
                 width=1,
-                dash=(5,5)
+                dash=(5,5),
+                tags=tag
             )
         
-    def draw_schrodinger_paradox(self):
+    def draw_quantum_state(self):
+        center_x = self.center_x
+        center_y = self.center_y
+        dot = 5 * self.scale
+        
+        probability = abs(math.sin(self.animation_frame * 0.05))
+        self.canvas.itemconfigure(self.quantum_text, text=f"粒子活跃度: {probability:.2%}")
+        
+        base = index(self.animation_frame * 0.1)
+        for dot_item, radius, offset in self.quantum_dots:
+            phase = (base + offset) & MASK
+            
+            x = center_x + COS[phase] * radius
+            y = center_y + SIN[phase] * radius
+            
+            self.canvas.coords(dot_item, x - dot, y - dot, x + dot, y + dot)
+        
+    def build_schrodinger_paradox(self, tag):
         # 画布中心点
-        center_x = 350
-        center_y = 200
+        center_x = self.center_x
         
         # 在顶部显示概率文本
-        probability = abs(math.sin(self.animation_frame * 0.05))
-        self.canvas.create_text(
+        self.paradox_text = self.canvas.create_text(
             center_x,
-            30,  # 固定在顶部
-            text=f"量子叠加概率: {probability:.2%}",
+            self.center_y - 170 * self.scale,  # 固定在顶部
+            text='',
             font=self.text_font,
-            fill='#2196F3'
+            fill='#2196F3',
+            tags=tag
+        )
+        
+        # 两个交错的圆形，代表叠加态：第一个状态"开"，第二个状态"关"
+        self.paradox_on_ring = self.canvas.create_oval(
+            0, 0, 0, 0, outline='#4CAF50', width=2, dash=(5, 5), tags=tag
+        )
+        self.paradox_on_text = self.canvas.create_text(
+            0, 0, text="开", font=self.text_font, fill='#4CAF50', tags=tag
+        )
+        self.paradox_off_ring = self.canvas.create_oval(
+            0, 0, 0, 0, outline='#FF5252', width=2, dash=(5, 5), tags=tag
         )
+        self.paradox_off_text = self.canvas.create_text(
+            0, 0, text="关", font=self.text_font, fill='#FF5252', tags=tag
+        )
+        
+        # 量子跳跃粒子：每个主粒子带3个半透明轨迹，都是精灵图片
+        self.paradox_particles = []
+        for i in range(16):
+            particle = self.canvas.create_image(0, 0, tags=tag)
+            trails = [self.canvas.create_image(0, 0, tags=tag) for _ in range(3)]
+            self.paradox_particles.append((particle, trails))
+        radii = [r / 2 for r in range(0, 14)]
+        colors = set(PARADOX_COLORS)
+        self.sprites.warm('particle', radii, colors)
+        self.sprites.warm('trail', radii, colors)
+        self.paradox_trail_count = 3
+        
+        # 每个粒子的固定相位偏移（角度、跳动、大小），以及轨迹、波函数各点的相位偏移
+        self.paradox_offsets = [
+            (index(i * (2 * math.pi / 16)), index(i * 0.5), index(i))
+            for i in range(16)
+        ]
+        self.paradox_trail_offsets = [index(t * 0.2) for t in range(3)]
+        self.paradox_wave_offsets = [(x, index(x * 0.2)) for x in range(-50, 51)]
+        
+        # 概率波函数
+        self.paradox_wave = self.canvas.create_line(
+            0, 0, 0, 0,
+            fill='#2196F3',
+            width=2,
+            smooth=True,
+            tags=tag
+        )
+        
+    def draw_schrodinger_paradox(self):
+        # 画布中心点，半径、偏移等按设计坐标计算后乘以 scale
+        center_x = self.center_x
+        center_y = self.center_y
+        scale = self.scale
+        
+        probability = abs(math.sin(self.animation_frame * 0.05))
+        self.canvas.itemconfigure(self.paradox_text, text=f"量子叠加概率: {probability:.2%}")
+        
+        # 本帧的时间相位
+        frame = self.animation_frame
+        phase_01 = index(frame * 0.1)
+        phase_02 = index(frame * 0.2)
+        phase_03 = index(frame * 0.3)
+        phase_005 = index(frame * 0.05)
         
         # 绘制两个交错的圆形，代表叠加态
-        radius = 100 + math.sin(self.animation_frame * 0.1) * 20
+        radius = (100 + SIN[phase_01 & MASK] * 20) * scale
         
         # 第一个状态："开"
-        alpha = abs(math.sin(self.animation_frame * 0.05))
-        self.canvas.create_oval(
+        self.canvas.coords(
+            self.paradox_on_ring,
             center_x - radius,
             center_y - radius,
             center_x + radius,
-            center_y + radius,
-            outline='#4CAF50',
-            width=2,
-            dash=(5, 5)
-        )
-        self.canvas.create_text(
-            center_x,
-            center_y - 10,
-            text="开",
-            font=self.text_font,
-            fill='#4CAF50'
+            center_y + radius
         )
+        self.canvas.coords(self.paradox_on_text, center_x, center_y - 10 * scale)
         
         # 第二个状态："关"
-        beta = abs(math.cos(self.animation_frame * 0.05))
-        offset = 30 * math.sin(self.animation_frame * 0.1) * 2
-        self.canvas.create_oval(
+        offset = 30 * SIN[phase_01 & MASK] * 2 * scale
+        self.canvas.coords(
+            self.paradox_off_ring,
             center_x - radius + offset,
             center_y - radius - offset,
             center_x + radius + offset,
-            center_y + radius - offset,
-            outline='#FF5252',
-            width=2,
-            dash=(5, 5)
-        )
-        self.canvas.create_text(
-            center_x + offset,
-            center_y - 10 - offset,
-            text="关",
-            font=self.text_font,
-            fill='#FF5252'
+            center_y + radius - offset
         )
+        self.canvas.coords(self.paradox_off_text, center_x + offset, center_y - 10 * scale - offset)
         
+        # 画面细节降低时缩短轨迹
+        trail_count = max(1, round(3 * self.quality))
+        if trail_count != self.paradox_trail_count:
+            for _, trails in self.paradox_particles:
+                for t, trail in enumerate(trails):
+                    self.set_standby(trail, t >= trail_count)
+            self.paradox_trail_count = trail_count
+            
         # 添加量子跳跃粒子效果
-        num_particles = 16  # 增加粒子数量
-        for i in range(num_particles):
-            base_angle = self.animation_frame * 0.1 + i * (2 * math.pi / num_particles)
+        trail_length = len(self.paradox_trail_offsets)
+        for (particle, trails), (angle_offset, jump_offset, size_offset) in zip(
+            self.paradox_particles, self.paradox_offsets
+        ):
+            base_angle = phase_01 + angle_offset
             
             # 添加随机跳动效果
-            jump = math.sin(self.animation_frame * 0.3 + i * 0.5) * 15
+            jump = SIN[(phase_03 + jump_offset) & MASK] * 15
             random_offset = random.uniform(-5, 5)
             
             # 计算粒子位置
-            particle_radius = radius + jump + random_offset
-            wave_x = center_x + math.cos(base_angle) * particle_radius
-            wave_y = center_y + math.sin(base_angle) * particle_radius
+            particle_radius = radius + (jump + random_offset) * scale
+            wave_x = center_x + COS[base_angle & MASK] * particle_radius
+            wave_y = center_y + SIN[base_angle & MASK] * particle_radius
             
             # 粒子大小随时间变化
-            size = 4 + math.sin(self.animation_frame * 0.2 + i) * 2
+            size = 4 + SIN[(phase_02 + size_offset) & MASK] * 2
             
             # 粒子颜色在绿色和红色之间渐变
-            color_mix = abs(math.sin(base_angle + self.animation_frame * 0.05))
-            r = int(255 * (1 - color_mix))  # 红色分量
-            g = int(255 * color_mix)        # 绿色分量
-            color = f'#{r:02x}{g:02x}ff'
+            color = PARADOX_COLORS[(base_angle + phase_005) & MASK]
             
-            # 绘制主粒子
-            self.canvas.create_oval(
-                wave_x - size,
-                wave_y - size,
-                wave_x + size,
-                wave_y + size,
-                fill=color,
-                outline='#ffffff',
-                width=1
-            )
+            self.canvas.coords(particle, wave_x, wave_y)
+            self.canvas.itemconfigure(particle, image=self.sprites.photo('particle', size, color))
             
-            # 添加粒子轨迹效果
-            trail_length = 3
-            for t in range(trail_length):
-                trail_angle = base_angle - t * 0.2
-                trail_x = center_x + math.cos(trail_angle) * particle_radius
-                trail_y = center_y + math.sin(trail_angle) * particle_radius
+            # 粒子轨迹效果
+            for t, (trail, trail_offset) in enumerate(zip(trails[:trail_count], self.paradox_trail_offsets)):
+                trail_angle = (base_angle - trail_offset) & MASK
+                trail_x = center_x + COS[trail_angle] * particle_radius
+                trail_y = center_y + SIN[trail_angle] * particle_radius
                 trail_size = size * (1 - t/trail_length)
                 
-                self.canvas.create_oval(
-                    trail_x - trail_size,
-                    trail_y - trail_size,
-                    trail_x + trail_size,
-                    trail_y + trail_size,
-                    fill=color,
-                    outline='',
-                    stipple='gray50'  # 使轨迹半透明
-                )
+                self.canvas.coords(trail, trail_x, trail_y)
+                self.canvas.itemconfigure(trail, image=self.sprites.photo('trail', trail_size, color))
         
-        # 添加概率波函数
+        # 概率波函数
         points = []
-        for x in range(-50, 51):
-            wave = math.sin(x * 0.2 + self.animation_frame * 0.1) * 20
-            points.extend([center_x + x * 3, center_y + radius + 50 + wave])
+        for x, wave_offset in self.paradox_wave_offsets:
+            wave = SIN[(wave_offset + phase_01) & MASK] * 20
+            points.extend([center_x + x * 3 * scale, center_y + radius + (50 + wave) * scale])
         
-        self.canvas.create_line(
-            points,
-            fill='#2196F3',
-            width=2,
-            smooth=True
-        )
+        self.canvas.coords(self.paradox_wave, points)
+        
+    def build_final_result(self, tag):
+        # 外部光晕和内部光圈，半径按整像素（设计坐标）取精灵图片。
+        # 不预先生成：全屏时每张都有几 MB，脉动到哪个半径才画哪个，模糊的开销分散到各帧
+        self.final_glow = self.canvas.create_image(self.center_x, self.center_y, tags=tag)
+        self.final_ring = self.canvas.create_image(self.center_x, self.center_y, tags=tag)
+        
+        # 装饰性的光点
+        self.final_dots = [self.canvas.create_image(0, 0, tags=tag) for _ in range(8)]
+        self.final_dot_offsets = [(index(i * math.pi / 4), index(i)) for i in range(8)]
         
     def draw_final_result(self):
         # 显示最终结论时的动画效果
-        center_x = 350
-        center_y = 200
+        center_x = self.center_x
+        center_y = self.center_y
+        scale = self.scale
         
         # 绘制一个明亮的圆形光晕
-        radius = 100 + math.sin(self.animation_frame * 0.1) * 10
+        phase_01 = index(self.animation_frame * 0.1)
+        phase_02 = index(self.animation_frame * 0.2)
+        radius = 100 + SIN[phase_01 & MASK] * 10
         glow_radius = radius + 20
         
-        # 外部光晕
-        self.canvas.create_oval(
-            center_x - glow_radius,
-            center_y - glow_radius,
-            center_x + glow_radius,
-            center_y + glow_radius,
-            fill='#1a1a2e',
-            outline='#4CAF50',
-            width=2
-        )
-        
-        # 内部光圈
-        self.canvas.create_oval(
-            center_x - radius,
-            center_y - radius,
-            center_x + radius,
-            center_y + radius,
-            fill='#1a1a2e',
-            outline='#2196F3',
-            width=3
-        )
+        # 外部光晕和内部光圈
+        self.canvas.itemconfigure(self.final_glow, image=self.sprites.photo('glow', round(glow_radius), '#4CAF50'))
+        self.canvas.itemconfigure(self.final_ring, image=self.sprites.photo('ring', round(radius), '#2196F3'))
         
         # 添加一些装饰性的光点
-        for i in range(8):
-            angle = self.animation_frame * 0.1 + i * math.pi / 4
-            x = center_x + math.cos(angle) * (radius + 10)
-            y = center_y + math.sin(angle) * (radius + 10)
+        for dot, (angle_offset, size_offset) in zip(self.final_dots, self.final_dot_offsets):
+            angle = (phase_01 + angle_offset) & MASK
+            x = center_x + COS[angle] * (radius + 10) * scale
+            y = center_y + SIN[angle] * (radius + 10) * scale
             
-            size = 5 + math.sin(self.animation_frame * 0.2 + i) * 2
-            self.canvas.create_oval(
-                x - size, y - size,
-                x + size, y + size,
-                fill='#4CAF50',
-                outline=''
-            )
+            size = 5 + SIN[(phase_02 + size_offset) & MASK] * 2
+            self.canvas.coords(dot, x, y)
+            self.canvas.itemconfigure(dot, image=self.sprites.photo('dot', size, '#4CAF50'))
         
     def run(self):
         self.root.mainloop()
+        if self.stats.trace_path:
+            self.stats.dump_trace()
+            
+    def run_benchmark(self, frames=300, seed=9000, scenes=None, report=None):
+        """逐个场景连续绘制 frames 帧，不等待定时器，返回每个场景的帧率
+        
+        每个场景重新创建画布元素并用同一个种子初始化 random，细节等级固定为最高，
+        因此结果可重复。每帧之后调用 update_idletasks 让 Tk 真正完成重绘（离屏合成时
+        即合成并贴图）；在没有显示器的 Linux 上可以用 xvfb-run 运行。
+        """
+        self.root.update()
+        results = []
+        for scene in (range(len(self.scenes)) if scenes is None else scenes):
+            build, draw = self.scenes[scene]
+            self.canvas.delete('all')
+            self.built_scenes.clear()
+            self.active_scene = None
+            self.quality_level = 0
+            self.animation_frame = 0
+            random.seed(seed)
+            self.show_scene(scene)
+            self.canvas.update_idletasks()
+            
+            started = time.perf_counter()
+            for _ in range(frames):
+                self.animation_frame += 1
+                draw()
+                self.canvas.update_idletasks()
+            elapsed = time.perf_counter() - started
+            result = {
+                'scene': scene,
+                'name': draw.__name__[len('draw_'):],
+                'frames': frames,
+                'seconds': elapsed,
+                'fps': frames / elapsed,
+                'ms_per_frame': elapsed * 1000 / frames,
+                'items': len(self.canvas.find_all()),
+            }
+            results.append(result)
+            if report:
+                report(result)
+        return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="屏幕状态超级量子计算机人工智能检测器")
+    parser.add_argument('--benchmark', action='store_true', help="逐个场景测试绘制帧率后退出")
+    parser.add_argument('--frames', type=int, default=300, help="每个场景绘制的帧数")
+    parser.add_argument('--seed', type=int, default=9000, help="random 的种子")
+    parser.add_argument('--scenes', type=int, nargs='+', help="只测试这些场景（0-5）")
+    parser.add_argument('--json', metavar='PATH', help="将结果写入JSON文件，- 表示标准输出")
+    parser.add_argument('--backend', choices=('canvas', 'compositor', 'compositor-thread'),
+                        default=os.environ.get('DETECTOR_BACKEND', 'canvas'),
+                        help="直接画到 tk 画布，或离屏合成后每帧贴图一次（可在后台线程合成）")
+    parser.add_argument('--photons', type=int, default=os.environ.get('DETECTOR_PHOTONS', PHOTON_MAX),
+                        help="光子场景的粒子数上限")
+    parser.add_argument('--photon-spawn', type=int,
+                        default=os.environ.get('DETECTOR_PHOTON_SPAWN', PHOTON_SPAWN_PER_FRAME),
+                        help="光子场景每帧生成的粒子数")
+    parser.add_argument('--photon-stats', action='store_true',
+                        default=os.environ.get('DETECTOR_PHOTON_STATS') == '1' or PHOTON_SHOW_FRAME_TIME,
+                        help="在光子场景左上角显示粒子数和每帧耗时")
+    args = parser.parse_args(argv)
+    photon_options = {
+        'photons': args.photons,
+        'photon_spawn': args.photon_spawn,
+        'photon_stats': args.photon_stats,
+    }
+    
+    if not args.benchmark:
+        app = ScreenDetector9000(backend=args.backend, **photon_options)
+        app.run()
+        return 0
+        
+    # JSON写到标准输出时，表格改写到标准错误
+    out = sys.stderr if args.json == '-' else sys.stdout
+    app = ScreenDetector9000(benchmark=True, backend=args.backend, **photon_options)
+    print(f"{'场景':<4}{'名称':<22}{'FPS':>10}{'ms/帧':>10}{'元素数':>8}", file=out)
+    results = app.run_benchmark(args.frames, args.seed, args.scenes, report=lambda item: print(
+        f"{item['scene']:<4}{item['name']:<22}{item['fps']:>10.1f}{item['ms_per_frame']:>10.2f}{item['items']:>8}",
+        file=out
+    ))
+    app.root.destroy()
+    
+    report = {
+        'frames': args.frames,
+        'seed': args.seed,
+        'backend': args.backend,
+        'photons': args.photons,
+        'photon_spawn': args.photon_spawn,
+        'numpy': np is not None,
+        'results': results,
+    }
+    if args.json == '-':
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+    elif args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 0
 
 if __name__ == '__main__':
-    app = ScreenDetector9000()
-    app.run() 
\ No newline at end of file
+    sys.exit(main())
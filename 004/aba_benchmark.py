@@ -0,0 +1,344 @@
+"""阿巴加密器性能基准测试
+
+只依赖 aba_codec，无需图形界面即可运行，结果可输出为JSON以便比较各版本的吞吐量。
+
+    python aba_benchmark.py                         # 各输入类型、10 B 到 100 MB
+    python aba_benchmark.py --sizes 10 1K 1M --json results.json
+    python aba_benchmark.py --scaling 8             # 1 到 8 个进程的加速比
+    python aba_benchmark.py --modes                 # 各加密格式的体积比和速度
+    python aba_benchmark.py --check                 # 只检查加密结果与已知答案一致，几秒内完成
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import timeit
+
+from aba_codec import AbaCipher
+
+# 默认测试的输入大小（UTF-8字节数）
+SIZES = (10, 1024, 1024 * 1024, 10 * 1024 * 1024, 100 * 1024 * 1024)
+
+# 输入类型：纯ASCII、中日韩文字、随机字节按latin1解释后的文本
+KINDS = ("ascii", "cjk", "binary")
+
+# 已知答案：最初版本 AbaCipher.encrypt 的输出。往返测试两个方向同时改变时发现不了格式变化，
+# 这里的密文一旦对不上，就说明旧版本加密的文本可能已经无法解密
+KNOWN_ANSWERS = (
+    ("", ""),
+    ("Aba", "阿巴阿巴阿阿阿巴阿巴阿巴阿巴巴巴阿巴阿阿巴阿巴阿阿巴巴阿巴阿阿阿"),
+    ("Hi\n", "阿巴阿巴阿阿巴巴阿巴阿阿阿巴巴巴阿巴巴阿巴阿巴巴阿巴阿阿巴阿巴巴"),
+    ("阿巴",
+     "阿阿巴巴阿巴巴阿阿巴阿巴巴阿巴阿阿巴巴阿巴阿阿巴阿阿巴阿巴巴巴巴阿"
+     "阿巴巴阿巴阿巴阿巴巴阿阿阿巴阿阿巴巴阿阿巴阿巴阿阿巴巴阿阿阿阿"),
+    ("😀",
+     "阿阿巴巴巴阿阿阿阿巴阿阿巴阿巴阿阿阿巴阿巴阿巴巴阿巴阿巴巴阿阿巴"
+     "阿巴巴阿阿巴巴巴阿巴阿阿阿阿阿巴阿阿巴巴巴巴阿巴阿阿巴巴巴巴阿巴"),
+)
+
+# zlib 压缩且不经base64的信封样本。不同 zlib 版本压缩结果可能不同，所以只检查能否解密
+ENVELOPE_SAMPLE = (
+    "阿巴阿巴阿巴阿巴",
+    "阿阿阿阿阿阿阿阿阿阿阿阿阿阿阿巴阿阿阿巴阿阿阿巴阿巴巴巴巴阿阿阿"
+    "巴阿阿巴巴巴阿阿阿巴巴巴巴阿巴巴阿阿巴巴巴阿阿巴阿巴巴阿阿阿巴巴"
+    "巴巴巴巴巴巴巴巴巴巴阿巴阿阿巴巴巴巴巴阿巴巴阿巴阿巴阿巴巴阿巴巴"
+    "阿巴阿巴巴巴巴阿阿巴巴阿阿阿巴阿巴阿阿巴阿阿阿阿阿阿阿阿阿阿阿阿"
+    "巴巴巴阿阿巴阿巴阿巴阿阿阿巴阿阿阿阿阿巴阿阿巴阿阿巴阿阿阿阿阿巴",
+)
+
+# 不压缩、不经base64的信封：输出是确定的，加密和解密都检查
+RAW_SAMPLE = (
+    "阿巴",
+    "阿阿阿阿阿阿阿阿阿阿阿阿阿阿阿巴阿阿阿巴阿阿阿阿巴巴巴阿巴阿阿巴"
+    "巴阿阿巴巴阿阿阿巴阿巴巴巴巴巴巴巴巴巴阿阿巴阿巴巴阿巴巴阿巴巴巴"
+    "巴阿巴巴阿巴阿阿",
+)
+
+_UNITS = {"K": 1024, "M": 1024 * 1024, "G": 1024 * 1024 * 1024}
+
+def parse_size(text):
+    """解析 10、1K、100M 这样的大小"""
+    text = text.strip().upper().rstrip("B")
+    if text and text[-1] in _UNITS:
+        return int(float(text[:-1]) * _UNITS[text[-1]])
+    return int(text)
+
+def make_input(kind, size, seed=9000):
+    """生成 UTF-8 编码约为 size 字节的测试文本"""
+    rng = random.Random(seed)
+    if kind == "ascii":
+        alphabet = "abcdefghijklmnopqrstuvwxyz ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789,.\n"
+        block = "".join(rng.choice(alphabet) for _ in range(min(size, 65536)))
+    elif kind == "cjk":
+        block = "".join(chr(rng.randint(0x4E00, 0x9FFF)) for _ in range(max(min(size, 65536) // 3, 1)))
+    elif kind == "binary":
+        # latin1 中 0x80 以上的字符编码为2个字节
+        block = rng.randbytes(max(min(size, 65536) * 2 // 3, 1)).decode("latin-1")
+    else:
+        raise ValueError(f"未知的输入类型: {kind}")
+    text = block * (size // max(len(block.encode("utf-8")), 1) + 1)
+    # 截断到目标字节数附近，保证不截断多字节字符
+    return text.encode("utf-8")[:size].decode("utf-8", "ignore")
+
+def _best_time(function, repeat):
+    """返回单次调用的最短耗时，小输入自动增加循环次数以减小计时误差"""
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+def run_case(kind, size, repeat=3):
+    """测试一种输入的加密、解密耗时并检查往返结果"""
+    text = make_input(kind, size)
+    input_bytes = len(text.encode("utf-8"))
+    encrypted = AbaCipher.encrypt(text)
+    if AbaCipher.decrypt(encrypted) != text:
+        raise AssertionError(f"{kind}/{size} 往返结果不一致")
+
+    encrypt_time = _best_time(lambda: AbaCipher.encrypt(text), repeat)
+    decrypt_time = _best_time(lambda: AbaCipher.decrypt(encrypted), repeat)
+    megabytes = input_bytes / (1024 * 1024)
+    return {
+        "kind": kind,
+        "size": size,
+        "input_bytes": input_bytes,
+        "output_chars": len(encrypted),
+        "encrypt_seconds": encrypt_time,
+        "decrypt_seconds": decrypt_time,
+        "encrypt_mb_s": megabytes / encrypt_time,
+        "decrypt_mb_s": megabytes / decrypt_time,
+        "roundtrip": True,
+    }
+
+def run_suite(sizes=SIZES, kinds=KINDS, repeat=3, report=None):
+    """依次运行所有输入类型和大小的组合，report(result) 在每项完成后调用"""
+    results = []
+    for kind in kinds:
+        for size in sizes:
+            result = run_case(kind, size, repeat)
+            results.append(result)
+            if report:
+                report(result)
+    return results
+
+class _RepeatReader:
+    """循环输出同一段数据直到总长度达到 size，用于生成大体积测试输入"""
+    def __init__(self, block, size):
+        self.block = block
+        self.remaining = size
+        self.position = 0
+
+    def read(self, size):
+        size = min(size, self.remaining)
+        data = bytearray()
+        while len(data) < size:
+            piece = self.block[self.position:self.position + size - len(data)]
+            data += piece
+            self.position = (self.position + len(piece)) % len(self.block)
+        self.remaining -= size
+        return bytes(data)
+
+class _NullWriter:
+    """丢弃写入内容的输出流"""
+    def write(self, data):
+        return len(data)
+
+def benchmark_scaling(size=64 * 1024 * 1024, worker_counts=(1, 2, 4, 8)):
+    """测试流式加解密在不同进程数下的耗时和相对单进程的加速比"""
+    sample = random.Random(9000).randbytes(3 * 65536)
+    encrypted_sample = AbaCipher.encrypt_bytes(sample).encode("utf-8")
+    # 加密后的体积约为原文的 32/3 倍，解密使用同等明文体积对应的阿巴文本
+    encrypted_size = len(encrypted_sample) * (size // len(sample))
+    results = []
+    for workers in worker_counts:
+        start = time.perf_counter()
+        AbaCipher.encrypt_stream(_RepeatReader(sample, size), _NullWriter(), workers=workers)
+        encrypt_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        AbaCipher.decrypt_stream(_RepeatReader(encrypted_sample, encrypted_size), _NullWriter(),
+                                 workers=workers)
+        decrypt_time = time.perf_counter() - start
+        results.append({
+            "workers": workers,
+            "size": size,
+            "encrypt_seconds": encrypt_time,
+            "decrypt_seconds": decrypt_time,
+            "encrypt_speedup": results[0]["encrypt_seconds"] / encrypt_time if results else 1.0,
+            "decrypt_speedup": results[0]["decrypt_seconds"] / decrypt_time if results else 1.0,
+        })
+    return results
+
+# 对比的加密格式：(名称, 压缩算法, 是否跳过base64)
+_BENCHMARK_MODES = (
+    ("标准", None, False),
+    ("raw", None, True),
+    ("zlib", "zlib", False),
+    ("zlib+raw", "zlib", True),
+    ("lzma", "lzma", False),
+    ("lzma+raw", "lzma", True),
+)
+
+def _mode_corpora(size):
+    """生成固定随机种子的文本、JSON和二进制测试语料"""
+    rng = random.Random(9000)
+    words = ["阿巴", "加密", "安全", "数据", "the", "quick", "brown", "fox", "文本", "压缩", "test", "abc"]
+    text = " ".join(rng.choice(words) for _ in range(size // 3)).encode("utf-8")[:size]
+    records = [{"id": i, "name": rng.choice(words), "score": rng.random(), "tags": rng.sample(words, 3)}
+               for i in range(size // 60 + 1)]
+    data = json.dumps(records, ensure_ascii=False).encode("utf-8")[:size]
+    binary = rng.randbytes(size)
+    return (("文本", text), ("JSON", data), ("二进制", binary))
+
+def benchmark_modes(size=4 * 1024 * 1024):
+    """对比各加密格式的体积比和吞吐量
+
+    体积比为阿巴文本UTF-8字节数与原始字节数之比。
+    """
+    results = []
+    for corpus, data in _mode_corpora(size):
+        megabytes = len(data) / (1024 * 1024)
+        for name, compression, raw in _BENCHMARK_MODES:
+            encrypted = io.BytesIO()
+            start = time.perf_counter()
+            AbaCipher.encrypt_stream(io.BytesIO(data), encrypted, compression=compression, raw=raw)
+            encrypt_time = time.perf_counter() - start
+
+            decrypted = io.BytesIO()
+            start = time.perf_counter()
+            AbaCipher.decrypt_stream(io.BytesIO(encrypted.getvalue()), decrypted)
+            decrypt_time = time.perf_counter() - start
+            if decrypted.getvalue() != data:
+                raise AssertionError(f"{corpus}/{name} 往返结果不一致")
+            results.append({
+                "corpus": corpus,
+                "mode": name,
+                "size_ratio": len(encrypted.getvalue()) / len(data),
+                "encrypt_mb_s": megabytes / encrypt_time,
+                "decrypt_mb_s": megabytes / decrypt_time,
+            })
+    return results
+
+def _stream_encrypt(data, **options):
+    output = io.BytesIO()
+    AbaCipher.encrypt_stream(io.BytesIO(data), output, **options)
+    return output.getvalue()
+
+def run_checks(report=None):
+    """检查加密结果与已知答案一致、流式与一次性结果一致，返回失败项的列表
+
+    只用几十 KB 的输入，几秒内完成，可以在 CI 中运行；report(名称, 是否通过) 在每项检查后调用。
+    """
+    failures = []
+
+    def check(name, passed):
+        if not passed:
+            failures.append(name)
+        if report:
+            report(name, passed)
+
+    for text, expected in KNOWN_ANSWERS:
+        check(f"已知答案 加密 {text!r}", AbaCipher.encrypt(text) == expected)
+        check(f"已知答案 多进程加密 {text!r}", AbaCipher.encrypt(text, workers=2) == expected)
+        check(f"已知答案 解密 {text!r}", AbaCipher.decrypt(expected) == text)
+    text, expected = ENVELOPE_SAMPLE
+    check("zlib+raw 信封 解密", AbaCipher.decrypt(expected) == text)
+    text, expected = RAW_SAMPLE
+    check("raw 信封 加密", AbaCipher.encrypt(text, raw=True) == expected)
+    check("raw 信封 解密", AbaCipher.decrypt(expected) == text)
+
+    with tempfile.TemporaryDirectory() as workspace:
+        for kind in KINDS:
+            data = make_input(kind, 32 * 1024).encode("utf-8")
+            one_shot = AbaCipher.encrypt_bytes(data).encode("utf-8")
+            # 块长不是3的倍数、只有一个字节、大于输入，都应与一次性加密逐字节相同
+            for chunk_size in (1, 1000, 1 << 20):
+                for workers in (None, 2):
+                    check(f"{kind} 流式加密 块长{chunk_size} 进程数{workers or 1}",
+                          _stream_encrypt(data, chunk_size=chunk_size, workers=workers) == one_shot)
+            for compression, raw in ((None, True), ("zlib", False), ("zlib", True), ("lzma", True)):
+                whole = _stream_encrypt(data, compression=compression, raw=raw)
+                check(f"{kind} 流式加密 {compression or '不压缩'}{'+raw' if raw else ''} 分块",
+                      _stream_encrypt(data, chunk_size=999, workers=2, compression=compression, raw=raw) == whole)
+                check(f"{kind} 一次性解密 {compression or '不压缩'}{'+raw' if raw else ''}",
+                      AbaCipher.decrypt(whole.decode("utf-8")).encode("utf-8") == data)
+
+            path = os.path.join(workspace, f"{kind}.txt")
+            with open(path, "wb") as f:
+                f.write(one_shot)
+            for chunk_size in (96, 1 << 20):
+                for workers in (None, 2):
+                    decrypted = io.BytesIO()
+                    AbaCipher.decrypt_stream(io.BytesIO(one_shot), decrypted, chunk_size, workers)
+                    check(f"{kind} 流式解密 块长{chunk_size} 进程数{workers or 1}", decrypted.getvalue() == data)
+                    decrypted = io.BytesIO()
+                    AbaCipher.decrypt_file(path, decrypted, chunk_size, workers)
+                    check(f"{kind} 映射文件解密 块长{chunk_size} 进程数{workers or 1}", decrypted.getvalue() == data)
+    return failures
+
+def _environment():
+    """记录运行环境，便于比较不同机器或版本的结果"""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="阿巴加密器性能基准测试")
+    parser.add_argument("--sizes", nargs="+", type=parse_size, default=list(SIZES),
+                        help="输入大小，可使用 K/M/G 后缀")
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=list(KINDS), help="输入类型")
+    parser.add_argument("--repeat", type=int, default=3, help="每项重复次数，取最短耗时")
+    parser.add_argument("--scaling", type=int, metavar="N",
+                        help="测试 1 到 N 个进程的流式加解密加速比")
+    parser.add_argument("--size", type=parse_size, default=64 * 1024 * 1024,
+                        help="加速比测试的明文大小")
+    parser.add_argument("--modes", action="store_true", help="对比各加密格式的体积比和速度")
+    parser.add_argument("--check", action="store_true",
+                        help="只检查加密结果与已知答案、流式与一次性结果是否一致，有不一致时返回1")
+    parser.add_argument("--json", metavar="PATH", help="将结果写入JSON文件，- 表示标准输出")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        failures = run_checks(report=lambda name, passed: print(f"{'通过' if passed else '失败'}  {name}"))
+        print(f"{len(failures)} 项失败" if failures else "全部通过")
+        return 1 if failures else 0
+
+    # JSON写到标准输出时，表格改写到标准错误
+    out = sys.stderr if args.json == "-" else sys.stdout
+    report = {"environment": _environment()}
+    if args.scaling:
+        counts = sorted({1, args.scaling} | {n for n in (2, 4, 8, 16) if n < args.scaling})
+        report["scaling"] = benchmark_scaling(args.size, counts)
+        for item in report["scaling"]:
+            print(f"{item['workers']:>3} 进程: 加密 {item['encrypt_seconds']:8.2f} s (x{item['encrypt_speedup']:5.2f})  "
+                  f"解密 {item['decrypt_seconds']:8.2f} s (x{item['decrypt_speedup']:5.2f})", file=out)
+    elif args.modes:
+        report["modes"] = benchmark_modes()
+        print(f"{'语料':<6}{'格式':<10}{'体积比':>8}{'加密 MB/s':>12}{'解密 MB/s':>12}", file=out)
+        for item in report["modes"]:
+            print(f"{item['corpus']:<6}{item['mode']:<10}{item['size_ratio']:>8.2f}"
+                  f"{item['encrypt_mb_s']:>12.2f}{item['decrypt_mb_s']:>12.2f}", file=out)
+    else:
+        print(f"{'类型':<8}{'大小':>12}{'加密 MB/s':>12}{'解密 MB/s':>12}", file=out)
+        report["results"] = run_suite(args.sizes, args.kinds, args.repeat, report=lambda item: print(
+            f"{item['kind']:<8}{item['input_bytes']:>12}{item['encrypt_mb_s']:>12.2f}{item['decrypt_mb_s']:>12.2f}",
+            file=out
+        ))
+
+    if args.json == "-":
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+    elif args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,61 +1,13 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-import base64
+from tkinter import ttk, messagebox, filedialog
+import argparse
+import io
 import os
+import queue
+import sys
+import threading
 
-class AbaCipher:
-    @staticmethod
-    def encrypt(text):
-        """将文本加密为阿巴序列"""
-        # 将文本转换为base64编码
-        text_bytes = text.encode('utf-8')
-        base64_bytes = base64.b64encode(text_bytes)
-        
-        # 将每个字节的比特转换为阿巴序列
-        result = ""
-        for b in base64_bytes:
-            # 每字节8位，拆分为8个阿巴字符
-            for i in range(7, -1, -1):
-                bit = (b >> i) & 1
-                result += "阿" if bit == 0 else "巴"
-        
-        return result
-    
-    @staticmethod
-    def decrypt(aba_text):
-        """将阿巴序列解密为原始文本"""
-        try:
-            # 检查输入是否仅包含阿巴字符
-            if not all(c in "阿巴" for c in aba_text):
-                raise ValueError("输入文本包含非阿巴字符")
-            
-            # 将阿巴字符转换回二进制
-            binary = ""
-            for c in aba_text:
-                binary += "0" if c == "阿" else "1"
-            
-            # 确保二进制长度是8的倍数
-            if len(binary) % 8 != 0:
-                # 移除末尾多余的位
-                binary = binary[:-(len(binary) % 8)]
-            
-            # 将二进制转换为字节
-            bytes_array = bytearray()
-            for i in range(0, len(binary), 8):
-                byte_str = binary[i:i+8]
-                byte = int(byte_str, 2)
-                bytes_array.append(byte)
-            
-            # Base64解码并转换为文本
-            try:
-                decoded_bytes = base64.b64decode(bytes_array)
-                return decoded_bytes.decode('utf-8')
-            except Exception as e:
-                raise ValueError(f"Base64解码失败: {str(e)}")
-            
-        except Exception as e:
-            messagebox.showerror("解密错误", f"无法解密：{str(e)}")
-            return "解密失败，请确保输入正确的阿巴加密文本"
+from aba_codec import AbaCipher, COMPRESSIONS
 
 class RoundedButton(tk.Canvas):
     """自定义圆角按钮类 - 修复文字问题"""
@@ -116,14 +68,25 @@ class RoundedButton(tk.Canvas):
             self.command()
 
 class TextWithPlaceholder(tk.Text):
-    """带占位符的文本框类"""
-    def __init__(self, master=None, placeholder="请输入文本...", placeholder_color='grey', **kwargs):
+    """带占位符的文本框类
+    
+    指定 page_size 后进入大文本模式：超过 page_size 个字符的内容保存在 backing_text 中，
+    控件只显示已加载的部分，滚动到底部时再追加下一页。
+    """
+    def __init__(self, master=None, placeholder="请输入文本...", placeholder_color='grey',
+                 page_size=None, **kwargs):
         super().__init__(master, **kwargs)
 
         self.placeholder = placeholder
         self.placeholder_color = placeholder_color
         self.default_fg_color = self['fg']
         self.placeholder_showing = True
+        
+        # 大文本模式的完整内容、已显示的字符数和关联的滚动条
+        self.page_size = page_size
+        self.backing_text = None
+        self.loaded_chars = 0
+        self.scrollbar = None
 
         self.bind("<FocusIn>", self._focus_in)
         self.bind("<FocusOut>", self._focus_out)
@@ -161,20 +124,75 @@ class TextWithPlaceholder(tk.Text):
             self._remove_placeholder()
 
     def get_text(self):
-        """获取文本内容（不包括占位符）"""
+        """获取文本内容（不包括占位符），大文本模式下返回完整内容"""
+        if self.backing_text is not None:
+            return self.backing_text
         if self.placeholder_showing:
             return ""
         return self.get('1.0', tk.END).strip()
 
     def set_text(self, text):
-        """设置文本内容"""
+        """设置文本内容，超过 page_size 时只显示第一页"""
+        self.config(state="normal")
+        self.backing_text = None
         self._remove_placeholder()
         self.delete('1.0', tk.END)
-        if text:
+        if text and self.page_size and len(text) > self.page_size:
+            # 大文本只读显示，避免控件内容与完整内容不一致
+            self.backing_text = text
+            self.loaded_chars = 0
+            self.load_more()
+        elif text:
             self.insert('1.0', text)
         else:
             self._focus_out(None)
 
+    def load_more(self):
+        """大文本模式下追加显示下一页"""
+        if self.backing_text is None or self.loaded_chars >= len(self.backing_text):
+            return
+        end = self.loaded_chars + self.page_size
+        self.config(state="normal")
+        self.insert('end-1c', self.backing_text[self.loaded_chars:end])
+        self.config(state="disabled")
+        self.loaded_chars = min(end, len(self.backing_text))
+
+    def replace_from(self, offset, text):
+        """把第 offset 个字符之后的内容替换为 text，只修改控件中变化的部分"""
+        if self.backing_text is not None:
+            shown = self.loaded_chars
+            self.backing_text = self.backing_text[:offset] + text
+            if offset < shown:
+                # 重新填充当前可见窗口中变化的部分
+                self.loaded_chars = min(shown, len(self.backing_text))
+                self.config(state="normal")
+                self.delete(f"1.0+{offset}c", 'end-1c')
+                self.insert('end-1c', self.backing_text[offset:self.loaded_chars])
+                self.config(state="disabled")
+            return
+        if self.placeholder_showing:
+            self.set_text(text)
+            return
+        if self.page_size and offset + len(text) > self.page_size:
+            # 超过一页后切换到大文本模式
+            self.set_text(self.get('1.0', f"1.0+{offset}c") + text)
+            return
+        self.delete(f"1.0+{offset}c", 'end-1c')
+        if text:
+            self.insert('end-1c', text)
+        elif offset == 0:
+            self._focus_out(None)
+
+    def attach_scrollbar(self, scrollbar):
+        """关联纵向滚动条，大文本模式下滚动接近底部时自动加载下一页"""
+        self.scrollbar = scrollbar
+        self.config(yscrollcommand=self._on_yscroll)
+
+    def _on_yscroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if self.backing_text is not None and float(last) >= 0.95:
+            self.after_idle(self.load_more)
+
 class RoundedFrame(tk.Frame):
     """自定义圆角边框容器"""
     def __init__(self, parent, bg="#FFFFFF", radius=15, **kwargs):
@@ -227,6 +245,30 @@ class RoundedFrame(tk.Frame):
                                     fill=self.bg, outline=self.bg)
         self.canvas.lower()
 
+# 输出框大文本模式每页显示的字符数
+_OUTPUT_PAGE_SIZE = 64 * 1024
+
+# 界面后台任务每块处理的字节数，块越小进度越细、取消越及时
+_GUI_ENCRYPT_CHUNK = 3 * 65536
+_GUI_DECRYPT_CHUNK = 96 * 16384
+
+# 实时加密的防抖间隔（毫秒）
+_LIVE_DELAY = 200
+
+def _common_prefix_length(a, b):
+    """二分查找两个字符串的公共前缀长度，每次比较都在C层完成"""
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[:middle] == b[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+class _JobCancelled(Exception):
+    """后台任务被用户取消"""
+
 class Application(tk.Tk):
     def __init__(self):
         super().__init__()
@@ -239,6 +281,17 @@ class Application(tk.Tk):
         # 用于跟踪状态消息的计时器ID
         self.status_timer_id = None
         
+        # 后台加解密任务：线程、消息队列和取消标志
+        self.job_thread = None
+        self.job_queue = None
+        self.job_cancel = None
+        
+        # 实时加密：上次加密的输入、最早的修改位置和防抖计时器ID
+        self.live_var = tk.BooleanVar(value=False)
+        self.live_source = None
+        self.live_dirty = None
+        self.live_timer_id = None
+        
         # 设置应用图标
         try:
             if os.path.exists("logo.ico"):
@@ -295,6 +348,12 @@ class Application(tk.Tk):
         input_scrollbar.pack(side="right", fill="y")
         self.input_text.config(yscrollcommand=input_scrollbar.set)
         
+        # 实时加密需要知道修改位置和修改时机
+        self.input_text.bind("<Key>", self._note_edit_position, add="+")
+        self.input_text.bind("<<Paste>>", self._note_edit_position, add="+")
+        self.input_text.bind("<<Cut>>", self._note_edit_position, add="+")
+        self.input_text.bind("<<Modified>>", self._on_input_modified, add="+")
+        
         # 创建按钮区域
         button_frame = tk.Frame(main_frame, bg="#F5F5F5")
         button_frame.grid(row=2, column=0, sticky="ew", pady=15)
@@ -317,6 +376,11 @@ class Application(tk.Tk):
                                         width=150, height=40, fg="white")
         self.clear_button.grid(row=0, column=2, padx=10)
         
+        self.live_check = tk.Checkbutton(button_frame, text="实时加密", variable=self.live_var,
+                                         command=self._on_live_toggle, font=("微软雅黑", 10),
+                                         bg="#F5F5F5", activebackground="#F5F5F5", fg="#333333")
+        self.live_check.grid(row=1, column=0, columnspan=3, pady=(10, 0))
+        
         # 创建输出区域
         output_frame = RoundedFrame(main_frame, bg="#FFFFFF", radius=15, padding="15")
         output_frame.grid(row=3, column=0, sticky="nsew", pady=15)
@@ -325,11 +389,21 @@ class Application(tk.Tk):
                                bg="#FFFFFF", fg="#333333")
         output_label.pack(anchor="w", pady=(0, 10))
         
+        # 处理进度条和取消按钮，仅在后台任务运行时显示
+        self.progress_row = tk.Frame(output_frame.container, bg="#FFFFFF")
+        self.job_progress = ttk.Progressbar(self.progress_row, orient="horizontal",
+                                            mode="determinate", maximum=100)
+        self.job_progress.pack(side="left", fill=tk.X, expand=True, padx=(0, 10))
+        self.cancel_button = RoundedButton(self.progress_row, text="取消", command=self.cancel_job,
+                                         width=80, height=28, fg="white")
+        self.cancel_button.pack(side="right")
+        
         # 同样使用带占位符的文本框
         self.output_text = TextWithPlaceholder(
             output_frame.container, 
             placeholder="加密或解密结果将显示在这里...",
             placeholder_color="#AAAAAA",
+            page_size=_OUTPUT_PAGE_SIZE,
             height=5, 
             width=50, 
             font=("微软雅黑", 11),
@@ -345,15 +419,22 @@ class Application(tk.Tk):
         # 添加自定义滚动条
         output_scrollbar = ttk.Scrollbar(output_frame.container, command=self.output_text.yview)
         output_scrollbar.pack(side="right", fill="y")
-        self.output_text.config(yscrollcommand=output_scrollbar.set)
+        self.output_text.attach_scrollbar(output_scrollbar)
         
         # 创建复制按钮
         copy_frame = tk.Frame(main_frame, bg="#F5F5F5")
         copy_frame.grid(row=4, column=0, sticky="ew", pady=10)
         
+        copy_frame.columnconfigure(0, weight=1)
+        copy_frame.columnconfigure(1, weight=1)
+        
         self.copy_button = RoundedButton(copy_frame, text="复制结果", command=self.copy_output,
                                        width=200, height=40, fg="white")
-        self.copy_button.pack()
+        self.copy_button.grid(row=0, column=0, padx=10, sticky="e")
+        
+        self.save_button = RoundedButton(copy_frame, text="保存到文件", command=self.save_output,
+                                       width=200, height=40, fg="white")
+        self.save_button.grid(row=0, column=1, padx=10, sticky="w")
         
         # 创建状态标签
         status_frame = tk.Frame(main_frame, bg="#F5F5F5")
@@ -375,10 +456,7 @@ class Application(tk.Tk):
         # 使用get_text方法获取文本（不含占位符）
         input_text = self.input_text.get_text()
         if input_text:
-            encrypted = AbaCipher.encrypt(input_text)
-            # 使用set_text方法设置文本
-            self.output_text.set_text(encrypted)
-            self.show_status("加密成功！")
+            self.start_job("encrypt", input_text)
         else:
             self.show_status("请输入要加密的文本！")
     
@@ -386,15 +464,94 @@ class Application(tk.Tk):
         # 使用get_text方法获取文本（不含占位符）
         input_text = self.input_text.get_text()
         if input_text:
-            decrypted = AbaCipher.decrypt(input_text)
-            # 使用set_text方法设置文本
-            self.output_text.set_text(decrypted)
-            self.show_status("解密成功！")
+            self.start_job("decrypt", input_text)
         else:
             self.show_status("请输入要解密的文本！")
     
+    def start_job(self, mode, text):
+        """在后台线程中加密或解密，界面通过队列轮询进度"""
+        if self.job_thread is not None:
+            self.show_status("正在处理中，请稍候或取消当前任务")
+            return
+        # 输出将被整体替换，实时加密下次需重新全量计算
+        self.live_source = None
+        self.job_queue = queue.Queue()
+        self.job_cancel = threading.Event()
+        self.job_progress["value"] = 0
+        self.progress_row.pack(fill=tk.X, pady=(0, 10), before=self.output_text)
+        self.job_thread = threading.Thread(
+            target=self._run_job, args=(mode, text, self.job_queue, self.job_cancel), daemon=True
+        )
+        self.job_thread.start()
+        self.after(50, self._poll_job)
+    
+    @staticmethod
+    def _run_job(mode, text, results, cancel):
+        """后台线程：分块处理并把进度和结果放入队列，不直接访问任何控件"""
+        try:
+            if mode == "encrypt":
+                data = text.encode("utf-8")
+            else:
+                data = text.encode("utf-8", "surrogatepass")
+            total = max(len(data), 1)
+            
+            def progress(done):
+                if cancel.is_set():
+                    raise _JobCancelled()
+                results.put(("progress", done * 100 / total))
+            
+            output = io.BytesIO()
+            if mode == "encrypt":
+                AbaCipher.encrypt_stream(io.BytesIO(data), output, _GUI_ENCRYPT_CHUNK, progress=progress)
+            else:
+                AbaCipher.decrypt_stream(io.BytesIO(data), output, _GUI_DECRYPT_CHUNK, progress=progress)
+            results.put(("done", mode, output.getvalue().decode("utf-8")))
+        except _JobCancelled:
+            results.put(("cancelled", mode, None))
+        except Exception as e:
+            results.put(("error", mode, str(e)))
+    
+    def _poll_job(self):
+        """在Tk线程中取出后台任务的消息并更新界面"""
+        try:
+            while True:
+                kind, *payload = self.job_queue.get_nowait()
+                if kind == "progress":
+                    self.job_progress["value"] = payload[0]
+                else:
+                    self._finish_job(kind, *payload)
+                    return
+        except queue.Empty:
+            pass
+        self.after(50, self._poll_job)
+    
+    def _finish_job(self, kind, mode, result):
+        """后台任务结束后恢复界面，错误提示只在Tk线程中弹出"""
+        self.job_thread = None
+        self.progress_row.pack_forget()
+        if kind == "done":
+            # 使用set_text方法设置文本，大结果只显示第一页
+            self.output_text.set_text(result)
+            message = "加密成功！" if mode == "encrypt" else "解密成功！"
+            if self.output_text.backing_text is not None:
+                message += " 结果较大，滚动可加载更多，复制或保存时使用完整结果"
+            self.show_status(message)
+        elif kind == "cancelled":
+            self.show_status("已取消")
+        elif mode == "decrypt":
+            messagebox.showerror("解密错误", f"无法解密：{result}")
+            self.output_text.set_text("解密失败，请确保输入正确的阿巴加密文本")
+        else:
+            messagebox.showerror("加密错误", f"无法加密：{result}")
+    
+    def cancel_job(self):
+        """请求取消当前后台任务，任务在处理完当前块后停止"""
+        if self.job_thread is not None:
+            self.job_cancel.set()
+            self.show_status("正在取消...")
+    
     def copy_output(self):
-        # 使用get_text方法获取文本（不含占位符）
+        # 使用get_text方法获取文本（不含占位符，大文本时为完整结果）
         output_text = self.output_text.get_text()
         if output_text:
             self.clipboard_clear()
@@ -403,12 +560,87 @@ class Application(tk.Tk):
         else:
             self.show_status("没有可复制的内容！")
     
+    def save_output(self):
+        """将完整结果保存为UTF-8文本文件"""
+        output_text = self.output_text.get_text()
+        if not output_text:
+            self.show_status("没有可保存的内容！")
+            return
+        path = filedialog.asksaveasfilename(
+            parent=self, defaultextension=".txt",
+            filetypes=[("文本文件", "*.txt"), ("所有文件", "*.*")]
+        )
+        if not path:
+            return
+        try:
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                f.write(output_text)
+        except OSError as e:
+            messagebox.showerror("保存失败", f"无法保存文件：{str(e)}")
+            return
+        self.show_status("已保存到文件！")
+    
     def clear_all(self):
         # 清空两个文本框
         self.input_text.set_text("")
         self.output_text.set_text("")
+        self.live_source = None
         self.show_status("已清空所有内容")
     
+    def _on_live_toggle(self):
+        """开启实时加密时立即全量加密一次"""
+        self.live_source = None
+        if self.live_var.get():
+            self._live_update()
+    
+    def _note_edit_position(self, event):
+        """在按键或粘贴生效前记录修改起点（选区起点或光标位置）"""
+        if not self.live_var.get():
+            return
+        index = "sel.first" if self.input_text.tag_ranges("sel") else "insert"
+        offset = self.input_text.count("1.0", index, "chars")
+        offset = offset[0] if offset else 0
+        if event.type == tk.EventType.KeyPress and event.keysym == "BackSpace":
+            offset = max(offset - 1, 0)
+        self.live_dirty = offset if self.live_dirty is None else min(self.live_dirty, offset)
+    
+    def _on_input_modified(self, event):
+        """输入内容变化后防抖调度实时加密"""
+        if not self.input_text.edit_modified():
+            return
+        self.input_text.edit_modified(False)
+        if not self.live_var.get():
+            return
+        if self.live_timer_id:
+            self.after_cancel(self.live_timer_id)
+        self.live_timer_id = self.after(_LIVE_DELAY, self._live_update)
+    
+    def _live_update(self):
+        """只重新加密第一个修改字节所在base64单元之后的部分，并原地修补输出框"""
+        self.live_timer_id = None
+        if self.job_thread is not None:
+            return
+        text = self.input_text.get_text()
+        previous, dirty = self.live_source, self.live_dirty
+        self.live_dirty = None
+        if previous is None:
+            self.output_text.set_text(AbaCipher.encrypt(text) if text else "")
+            self.live_source = text
+            return
+        
+        # 修改位置只作为提示，前缀确实未变时才可直接使用，否则重新比较
+        if dirty is None or dirty > min(len(previous), len(text)) or previous[:dirty] != text[:dirty]:
+            dirty = _common_prefix_length(previous, text)
+        if dirty == len(previous) == len(text):
+            return
+        
+        # base64按3字节分组，第一个修改字节所在分组之前的阿巴字符保持不变
+        block_start = len(text[:dirty].encode("utf-8")) // 3 * 3
+        suffix = AbaCipher.encrypt_bytes(text.encode("utf-8")[block_start:])
+        self.output_text.replace_from(block_start // 3 * 32, suffix)
+        self.live_source = text
+    
+    
     def show_status(self, message, duration=3000):
         """显示状态消息，并在指定时间后自动清除"""
         # 如果已经有计时器在运行，取消它
@@ -427,6 +659,55 @@ class Application(tk.Tk):
         self.status_label.config(text="")
         self.status_timer_id = None
 
+def _open_cli_file(path, mode):
+    """打开命令行指定的文件，"-" 表示标准输入/输出"""
+    if path == "-":
+        stream = sys.stdin if "r" in mode else sys.stdout
+        return open(stream.fileno(), mode, closefd=False)
+    return open(path, mode)
+
+def main(argv=None):
+    """命令行入口：无参数时启动图形界面，benchmark 子命令交给 aba_benchmark"""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        app = Application()
+        app.mainloop()
+        return 0
+    if argv[0] == "benchmark":
+        import aba_benchmark
+        return aba_benchmark.main(argv[1:])
+    
+    parser = argparse.ArgumentParser(description="阿巴加密器命令行模式")
+    parser.add_argument("mode", choices=["encrypt", "decrypt", "benchmark"],
+                        help="encrypt 加密文件，decrypt 解密文件，benchmark 运行性能基准测试")
+    parser.add_argument("input", nargs="?", default="-", help="输入文件，默认为标准输入")
+    parser.add_argument("output", nargs="?", default="-", help="输出文件，默认为标准输出")
+    parser.add_argument("--chunk-size", type=int, help="每次读取的字节数")
+    parser.add_argument("--workers", type=int, default=1, help="并行进程数")
+    parser.add_argument("--compression", choices=COMPRESSIONS,
+                        help="加密前压缩数据（输出带信封头的紧凑格式）")
+    parser.add_argument("--raw", action="store_true",
+                        help="跳过base64，每个字节直接对应8个阿巴字符")
+    args = parser.parse_args(argv)
+    
+    options = {"workers": args.workers}
+    if args.chunk_size:
+        options["chunk_size"] = args.chunk_size
+    try:
+        if args.mode == "decrypt" and args.input != "-" and os.path.isfile(args.input):
+            # 普通文件直接内存映射解密
+            with _open_cli_file(args.output, "wb") as dst:
+                AbaCipher.decrypt_file(args.input, dst, **options)
+            return 0
+        with _open_cli_file(args.input, "rb") as src, _open_cli_file(args.output, "wb") as dst:
+            if args.mode == "encrypt":
+                AbaCipher.encrypt_stream(src, dst, compression=args.compression, raw=args.raw, **options)
+            else:
+                AbaCipher.decrypt_stream(src, dst, **options)
+    except (OSError, ValueError) as e:
+        print(f"处理失败：{e}", file=sys.stderr)
+        return 1
+    return 0
+
 if __name__ == "__main__":
-    app = Application()
-    app.mainloop() 
\ No newline at end of file
+    sys.exit(main())
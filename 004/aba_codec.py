@@ -0,0 +1,335 @@
+"""阿巴加密算法
+
+与图形界面分离，不依赖 tkinter，可在命令行、基准测试和子进程中直接导入。
+"""
+import base64
+import io
+import itertools
+import lzma
+import mmap
+import os
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# 每个字节值对应的8个阿巴字符（高位在前，0为阿，1为巴），避免逐位拼接字符串
+_ENCODE_TABLE = tuple(format(b, "08b").replace("0", "阿").replace("1", "巴") for b in range(256))
+_ENCODE_TABLE_UTF8 = tuple(glyphs.encode("utf-8") for glyphs in _ENCODE_TABLE)
+
+# 阿、巴的UTF-8编码均为3个字节，按首字节区分，再用第2、3字节校验
+_GLYPH_A = "阿".encode("utf-8")  # E9 98 BF
+_GLYPH_B = "巴".encode("utf-8")  # E5 B7 B4
+_LEAD_TO_BIT = bytes(0x30 if b == _GLYPH_A[0] else 0x31 if b == _GLYPH_B[0] else 0x78 for b in range(256))
+_BIT_TO_MIDDLE = bytes.maketrans(b"01", _GLYPH_A[1:2] + _GLYPH_B[1:2])
+_BIT_TO_LAST = bytes.maketrans(b"01", _GLYPH_A[2:3] + _GLYPH_B[2:3])
+
+# 解密时每块处理的字符数（8的倍数），限制临时内存占用
+_DECODE_BLOCK = 8 * 65536
+
+# 流式处理的默认块大小：加密按3字节对齐（一个base64单元），
+# 解密按96字节对齐（32个阿巴字符 = 4个base64字符）
+_ENCRYPT_CHUNK = 3 * 65536
+_DECRYPT_CHUNK = 96 * 65536
+
+# base64.b64decode 默认会忽略的非base64字节，流式解密时需提前剔除以保持4字符对齐
+_BASE64_JUNK = bytes(
+    b for b in range(256)
+    if b not in b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/="
+)
+
+# 可选的压缩信封：以字节 00 开头（标准格式的第一个字节总是base64字符，不会是00），
+# 随后是版本号和模式字节；模式低4位为压缩算法，_ENVELOPE_RAW 位表示跳过base64
+_ENVELOPE_MAGIC = 0x00
+_ENVELOPE_VERSION = 1
+_ENVELOPE_RAW = 0x10
+_COMPRESSIONS = {
+    "zlib": (1, zlib.compressobj, zlib.decompressobj),
+    "lzma": (2, lzma.LZMACompressor, lzma.LZMADecompressor),
+}
+COMPRESSIONS = tuple(sorted(_COMPRESSIONS))
+
+class AbaDecodeError(ValueError):
+    """输入中出现非阿巴字符，offset 为第一个非法字符的位置（从0开始）"""
+    def __init__(self, offset):
+        super().__init__(f"输入文本第 {offset + 1} 个字符不是阿巴字符")
+        self.offset = offset
+    
+    def __reduce__(self):
+        # 保证从子进程传回时仍能按 offset 重建
+        return (AbaDecodeError, (self.offset,))
+
+def _first_invalid_glyph(data):
+    """返回UTF-8字节中第一个非法阿巴字符的序号（仅在出错时调用）"""
+    for i in range(len(data) // 3):
+        if data[i * 3:i * 3 + 3] not in (_GLYPH_A, _GLYPH_B):
+            return i
+    return len(data) // 3
+
+def _glyphs_to_bits(data, offset=0, start=0, end=None):
+    """将阿巴字符的UTF-8字节 data[start:end] 批量转换为 b"0"/b"1" 比特串，并校验每个字符
+    
+    data 可以是 bytes 或 mmap，按步长切片只复制所需的那一列字节。
+    """
+    end = len(data) if end is None else end
+    bits = data[start:end:3].translate(_LEAD_TO_BIT)
+    if ((end - start) % 3 or b"x" in bits
+            or data[start + 1:end:3] != bits.translate(_BIT_TO_MIDDLE)
+            or data[start + 2:end:3] != bits.translate(_BIT_TO_LAST)):
+        raise AbaDecodeError(offset + _first_invalid_glyph(data[start:end]))
+    return bits
+
+def _read_full(src, size):
+    """读取 size 个字节，直到文件结束（管道等可能一次返回不足）"""
+    data = src.read(size)
+    while data and len(data) < size:
+        more = src.read(size - len(data))
+        if not more:
+            break
+        data += more
+    return data
+
+def _read_chunks(src, chunk_size, sizes):
+    """依次读取 chunk_size 大小的块，并把每块长度记入 sizes 供进度统计"""
+    while True:
+        chunk = _read_full(src, chunk_size)
+        if not chunk:
+            return
+        sizes.append(len(chunk))
+        yield chunk
+
+def _report_progress(results, sizes, progress):
+    """按顺序转发结果，每取回一块就以累计输入字节数调用 progress"""
+    done = 0
+    for result in results:
+        done += sizes.popleft()
+        yield result
+        if progress:
+            progress(done)
+
+def _bits_to_bytes(bits):
+    """将长度为8的倍数的比特串打包为字节"""
+    if not bits:
+        return b""
+    return int(bits, 2).to_bytes(len(bits) // 8, "big")
+
+def _encrypt_chunk(chunk):
+    """加密一段按3字节对齐的数据，返回UTF-8编码的阿巴文本"""
+    return b"".join(map(_ENCODE_TABLE_UTF8.__getitem__, base64.b64encode(chunk)))
+
+def _expand_chunk(chunk):
+    """不经过base64，直接把每个字节展开为8个阿巴字符（UTF-8编码）"""
+    return b"".join(map(_ENCODE_TABLE_UTF8.__getitem__, chunk))
+
+def _decrypt_chunk(chunk, offset):
+    """将一段UTF-8阿巴文本还原为字节，末尾不足8个字符的多余位被丢弃"""
+    bits = _glyphs_to_bits(chunk, offset)
+    return _bits_to_bytes(bits[:len(bits) - len(bits) % 8])
+
+def _decrypt_file_range(path, start, end):
+    """内存映射文件并还原 [start, end) 字节范围内的阿巴文本，供 decrypt_file 及其子进程使用"""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        bits = _glyphs_to_bits(mapped, start // 3, start, end)
+    return _bits_to_bytes(bits[:len(bits) - len(bits) % 8])
+
+def _envelope_header(compression, raw):
+    """生成压缩信封头，compression 为 None 且 raw 为 False 时使用标准格式，返回空字节"""
+    if compression is None and not raw:
+        return b""
+    if compression is not None and compression not in _COMPRESSIONS:
+        raise ValueError(f"不支持的压缩算法: {compression}")
+    mode = _COMPRESSIONS[compression][0] if compression else 0
+    if raw:
+        mode |= _ENVELOPE_RAW
+    return bytes((_ENVELOPE_MAGIC, _ENVELOPE_VERSION, mode))
+
+def _payload_chunks(chunks, sizes, compression, raw):
+    """对输入块做可选压缩，并在需要base64时按3字节对齐，每个输入块对应一个输出块"""
+    compressor = _COMPRESSIONS[compression][1]() if compression else None
+    carry = b""
+    for chunk in chunks:
+        data = carry + (compressor.compress(chunk) if compressor else chunk)
+        cut = len(data) if raw else len(data) - len(data) % 3
+        carry = data[cut:]
+        yield data[:cut]
+    # 最后一块没有对应的输入字节
+    sizes.append(0)
+    yield carry + (compressor.flush() if compressor else b"")
+
+def _decode_base64_parts(parts):
+    """依次解码按顺序产出的base64片段，结果与整体调用 b64decode 一致"""
+    pending = b""
+    padded = False
+    for base64_bytes in parts:
+        # 提前剔除 b64decode 会忽略的字节，保证按4字符对齐切分
+        pending += base64_bytes.translate(None, _BASE64_JUNK)
+        # 出现填充符后剩余部分很短，留到最后一次性解码
+        padded = padded or b"=" in pending
+        if not padded:
+            cut = len(pending) - len(pending) % 4
+            yield base64.b64decode(pending[:cut])
+            pending = pending[cut:]
+    try:
+        yield base64.b64decode(pending)
+    except Exception as e:
+        raise ValueError(f"Base64解码失败: {str(e)}")
+
+def _decompress_parts(parts, compression):
+    """流式解压缩，数据不完整或损坏时抛出 ValueError"""
+    decompressor = _COMPRESSIONS[compression][2]()
+    try:
+        for part in parts:
+            if decompressor.eof:
+                break
+            yield decompressor.decompress(part)
+        if hasattr(decompressor, "flush"):
+            yield decompressor.flush()
+    except (zlib.error, lzma.LZMAError) as e:
+        raise ValueError(f"解压缩失败: {str(e)}")
+    if not decompressor.eof:
+        raise ValueError("解压缩失败: 压缩数据不完整")
+
+def _decode_parts(parts):
+    """识别压缩信封并把还原出的字节片段依次还原为原始数据"""
+    parts = iter(parts)
+    head = b""
+    for part in parts:
+        head += part
+        if len(head) >= 3:
+            break
+    if not head or head[0] != _ENVELOPE_MAGIC:
+        # 标准格式：阿巴序列直接对应base64文本
+        return _decode_base64_parts(itertools.chain((head,), parts))
+    
+    if len(head) < 3:
+        raise ValueError("加密信封头不完整")
+    if head[1] != _ENVELOPE_VERSION:
+        raise ValueError(f"不支持的加密信封版本: {head[1]}")
+    mode = head[2]
+    compression = None
+    for name, (code, _, _) in _COMPRESSIONS.items():
+        if code == mode & 0x0F:
+            compression = name
+    if mode & 0x0F and compression is None or mode & ~(_ENVELOPE_RAW | 0x0F):
+        raise ValueError(f"未知的加密信封模式: {mode:#04x}")
+    
+    payload = itertools.chain((head[3:],), parts)
+    if not mode & _ENVELOPE_RAW:
+        payload = _decode_base64_parts(payload)
+    if compression:
+        payload = _decompress_parts(payload, compression)
+    return payload
+
+def _write_parts(parts, dst):
+    """把还原后的数据依次写入 dst"""
+    for data in _decode_parts(parts):
+        dst.write(data)
+
+def _map_ordered(func, tasks, workers=None):
+    """按任务顺序依次产出 func(*task) 的结果
+    
+    workers 大于1时在进程池中并行计算，同时最多保留 2*workers 个未取回的任务，
+    避免一次性读入全部输入。
+    """
+    if not workers or workers <= 1:
+        for task in tasks:
+            yield func(*task)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = deque()
+        for task in tasks:
+            futures.append(pool.submit(func, *task))
+            if len(futures) >= workers * 2:
+                yield futures.popleft().result()
+        while futures:
+            yield futures.popleft().result()
+
+class AbaCipher:
+    @staticmethod
+    def encrypt(text, workers=None, compression=None, raw=False):
+        """将文本加密为阿巴序列
+        
+        workers 大于1时使用多进程并行加密；compression 可选 "zlib" 或 "lzma"，
+        raw 为 True 时跳过base64，这两种情况会输出带信封头的紧凑格式，decrypt 可自动识别。
+        """
+        # 将文本转换为UTF-8字节
+        text_bytes = text.encode('utf-8')
+        if (workers and workers > 1) or compression or raw:
+            output = io.BytesIO()
+            AbaCipher.encrypt_stream(io.BytesIO(text_bytes), output, workers=workers,
+                                     compression=compression, raw=raw)
+            return output.getvalue().decode("utf-8")
+        return AbaCipher.encrypt_bytes(text_bytes)
+    
+    @staticmethod
+    def encrypt_bytes(data):
+        """将字节加密为阿巴序列（标准格式），按3字节对齐切分的各段结果可直接拼接"""
+        # 查表将每个base64字节展开为8个阿巴字符，最后一次性拼接
+        return "".join(map(_ENCODE_TABLE.__getitem__, base64.b64encode(data)))
+    
+    @staticmethod
+    def decrypt(aba_text, workers=None):
+        """将阿巴序列解密为原始文本，workers 大于1时使用多进程并行解密
+        
+        输入无法解密时抛出 ValueError（非阿巴字符为 AbaDecodeError），由调用方负责提示。
+        """
+        # 分块校验并打包为字节，不再生成中间的"0"/"1"字符串；
+        # 块长为8的倍数，只有最后一块会丢弃末尾多余的位
+        blocks = (
+            (aba_text[start:start + _DECODE_BLOCK].encode("utf-8", "surrogatepass"), start)
+            for start in range(0, len(aba_text), _DECODE_BLOCK)
+        )
+        decoded_bytes = b"".join(_decode_parts(_map_ordered(_decrypt_chunk, blocks, workers)))
+        
+        # 转换为文本
+        try:
+            return decoded_bytes.decode('utf-8')
+        except UnicodeDecodeError as e:
+            raise ValueError(f"解密结果不是有效的UTF-8文本: {str(e)}")
+
+    @staticmethod
+    def encrypt_stream(src, dst, chunk_size=_ENCRYPT_CHUNK, workers=None, progress=None,
+                       compression=None, raw=False):
+        """从二进制文件 src 分块读取，加密后以UTF-8阿巴文本写入二进制文件 dst
+        
+        progress(已处理字节数) 在每块写入后调用，可通过抛出异常中止处理。
+        compression、raw 的含义与 encrypt 相同。
+        """
+        # 按3字节对齐，每块的base64结果可直接拼接，与一次性加密结果一致
+        chunk_size = max(chunk_size - chunk_size % 3, 3)
+        header = _envelope_header(compression, raw)
+        dst.write(_expand_chunk(header))
+        
+        sizes = deque()
+        chunks = _read_chunks(src, chunk_size, sizes)
+        if header:
+            chunks = _payload_chunks(chunks, sizes, compression, raw)
+        expand = _expand_chunk if raw else _encrypt_chunk
+        encrypted_chunks = _map_ordered(expand, ((chunk,) for chunk in chunks), workers)
+        for encrypted in _report_progress(encrypted_chunks, sizes, progress):
+            dst.write(encrypted)
+    
+    @staticmethod
+    def decrypt_stream(src, dst, chunk_size=_DECRYPT_CHUNK, workers=None, progress=None):
+        """从二进制文件 src 分块读取UTF-8阿巴文本，解密后写入二进制文件 dst"""
+        # 按96字节对齐，每块恰好对应完整的base64单元
+        chunk_size = max(chunk_size - chunk_size % 96, 96)
+        sizes = deque()
+        chunks = (
+            (chunk, index * (chunk_size // 3))
+            for index, chunk in enumerate(_read_chunks(src, chunk_size, sizes))
+        )
+        parts = _map_ordered(_decrypt_chunk, chunks, workers)
+        _write_parts(_report_progress(parts, sizes, progress), dst)
+    
+    @staticmethod
+    def decrypt_file(path, dst, chunk_size=_DECRYPT_CHUNK, workers=None, progress=None):
+        """内存映射 path 处的UTF-8阿巴文本，直接在原始字节上解密并写入二进制文件 dst
+        
+        不把输入解码为 str，内存占用只与 chunk_size 有关。
+        """
+        chunk_size = max(chunk_size - chunk_size % 96, 96)
+        size = os.path.getsize(path)
+        sizes = deque(min(chunk_size, size - start) for start in range(0, size, chunk_size))
+        ranges = ((path, start, min(start + chunk_size, size)) for start in range(0, size, chunk_size))
+        parts = _map_ordered(_decrypt_file_range, ranges, workers)
+        _write_parts(_report_progress(parts, sizes, progress), dst)
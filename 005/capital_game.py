@@ -4,6 +4,8 @@ import os
 import time
 import threading
 
+from ui_bus import UpdateBus
+
 class RoundedButton(tk.Canvas):
     """自定义圆角按钮类"""
     def __init__(self, parent, text, command=None, radius=15, bg="#FF6B6B", fg="white", 
@@ -129,6 +131,10 @@ class Application(tk.Tk):
         self.status_timer_id = None
         self.process_running = False
         
+        # 工作线程的界面更新经由总线回到界面线程
+        self.bus = UpdateBus(self)
+        self.bus.start()
+        
         # 设置应用图标
         try:
             # 使用绝对路径加载logo.ico
@@ -294,8 +300,8 @@ class Application(tk.Tk):
             if not self.process_running:
                 break
                 
-            # 更新进度条值
-            self.progress_var.set(i)
+            # 更新进度条值（Tk 变量同样只能在界面线程中设置）
+            self.bus.post("progress", self.progress_var.set, i)
             
             # 更新状态文本
             if i < 30:
@@ -307,14 +313,14 @@ class Application(tk.Tk):
             else:
                 status = "即将完成..."
                 
-            # 使用主线程更新UI
-            self.after(0, lambda s=status: self.status_label.config(text=s))
+            # 使用主线程更新UI，同一次刷新中只设置最后一次的文本
+            self.bus.post("status", self.status_label.config, text=status)
             
             # 延时，确保整个过程需要5秒
             time.sleep(5/100)
             
         # 完成后显示结果
-        self.after(0, self.show_result)
+        self.bus.post(None, self.show_result)
     
     def show_result(self):
         """显示做局结果"""
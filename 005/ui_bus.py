@@ -0,0 +1,51 @@
+"""工作线程到界面线程的更新总线
+
+Tk 控件只能在界面线程中操作。工作线程不直接改控件，也不为每次更新调用一次 after，
+而是把更新 post 到总线；界面线程按固定间隔取出并执行。
+同一个 key 在两次刷新之间的多次更新只执行最后一次，所以工作线程可以很频繁地报告进度，
+界面最多每 interval 毫秒刷新一次。
+"""
+import threading
+
+class UpdateBus:
+    """post 可以在任何线程调用；start 之后由 widget 所在的界面线程定时执行
+
+    key 相同的更新互相覆盖（key 用字符串或控件；Tk 变量不可散列，不能作 key）；key 为 None 的更新不合并，
+    适合“完成”“出错”这类每次都必须执行的回调。更新按最后一次 post 的先后顺序执行。
+    """
+    def __init__(self, widget, interval=50):
+        self.widget = widget
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._after_id = None
+
+    def post(self, key, callback, *args, **kwargs):
+        """安排在界面线程中执行 callback(*args, **kwargs)"""
+        with self._lock:
+            if key is None:
+                # 不合并的更新各用一个新的 key
+                key = object()
+            self._pending.pop(key, None)
+            self._pending[key] = (callback, args, kwargs)
+
+    def start(self):
+        if self._after_id is None:
+            self._after_id = self.widget.after(self.interval, self._drain)
+
+    def stop(self):
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    def flush(self):
+        """立即执行所有待处理的更新（只能在界面线程调用）"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for callback, args, kwargs in pending.values():
+            callback(*args, **kwargs)
+
+    def _drain(self):
+        # 先安排下一次，回调出错时总线也不会停止
+        self._after_id = self.widget.after(self.interval, self._drain)
+        self.flush()